@@ -6,11 +6,60 @@ This script demonstrates how to use the new task monitoring API
 to track and monitor background tasks.
 """
 
+import ijson
 import requests
-import time
 import json
+import sys
+import os
+
+# The HTTP helpers are shared with the API scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from _http_client import SESSION, ETagCache, youtube_id
 
 BASE_URL = "http://localhost:8000"
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+STATS_CACHE = ETagCache(SESSION)
+
+def long_poll_task(task_id):
+    """Yield task states by long-polling, for servers without the stream endpoint"""
+    while True:
+        response = SESSION.get(f"{BASE_URL}/tasks/{task_id}", params={"wait_for_change": "true"})
+        response.raise_for_status()
+        task = response.json()
+        yield task
+        if task["status"] in TERMINAL_STATUSES:
+            break
+
+def stream_task(task_id):
+    """Yield task states from the server-sent event stream until the task finishes"""
+    with SESSION.get(
+        f"{BASE_URL}/tasks/{task_id}/stream",
+        headers={"Accept": "text/event-stream"},
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            # Skip keep-alive comments and event separators
+            if not line or not line.startswith("data:"):
+                continue
+            task = json.loads(line[len("data:"):])
+            yield task
+            if task["status"] in TERMINAL_STATUSES:
+                break
+
+def show_updates(task_updates):
+    """Print each task update as it arrives"""
+    for i, task in enumerate(task_updates, 1):
+        status = task["status"]
+        progress = task.get("progress", "No progress info")
+        print(f"   ⏳ Update {i}: Status={status}, Progress={progress}")
+        
+        if status in TERMINAL_STATUSES:
+            print(f"   ✅ Task finished with status: {status}")
+            if status == "failed" and task.get("error_message"):
+                print(f"   ❌ Error: {task['error_message']}")
 
 def main():
     """Demo the task monitoring API"""
@@ -20,7 +69,7 @@ def main():
     # 1. Check how many background tasks are running
     print("\n1️⃣  Checking running background tasks...")
     try:
-        response = requests.get(f"{BASE_URL}/tasks/count/running")
+        response = SESSION.get(f"{BASE_URL}/tasks/count/running")
         if response.status_code == 200:
             count = response.json()["running_tasks"]
             print(f"   📊 Currently running tasks: {count}")
@@ -33,7 +82,7 @@ def main():
     
     # 2. Get detailed task statistics
     print("\n2️⃣  Getting task statistics...")
-    response = requests.get(f"{BASE_URL}/tasks/stats")
+    response = STATS_CACHE.get(f"{BASE_URL}/tasks/stats")
     if response.status_code == 200:
         stats = response.json()
         print(f"   📈 Total tasks: {stats['total_tasks']}")
@@ -46,9 +95,9 @@ def main():
     # 3. Trigger a background task
     print("\n3️⃣  Triggering a background task...")
     ingest_data = {
-        "videos": ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]
+        "videos": [youtube_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ")]
     }
-    response = requests.post(f"{BASE_URL}/ingest", json=ingest_data)
+    response = SESSION.post(f"{BASE_URL}/ingest", json=ingest_data)
     if response.status_code == 200:
         result = response.json()
         task_id = result["task_id"]
@@ -57,26 +106,20 @@ def main():
         
         # 4. Monitor the task
         print("\n4️⃣  Monitoring task progress...")
-        for i in range(10):
-            time.sleep(2)
-            response = requests.get(f"{BASE_URL}/tasks/{task_id}")
-            if response.status_code == 200:
-                task = response.json()
-                status = task["status"]
-                progress = task.get("progress", "No progress info")
-                print(f"   ⏳ Check {i+1}: Status={status}, Progress={progress}")
-                
-                if status in ["completed", "failed"]:
-                    print(f"   ✅ Task finished with status: {status}")
-                    if status == "failed" and task.get("error_message"):
-                        print(f"   ❌ Error: {task['error_message']}")
-                    break
-            else:
-                print(f"   ❌ Failed to get task status: {response.status_code}")
+        try:
+            try:
+                show_updates(stream_task(task_id))
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code != 404:
+                    raise
+                print("   ⚠️  Task stream not available, falling back to long-polling")
+                show_updates(long_poll_task(task_id))
+        except requests.exceptions.HTTPError as e:
+            print(f"   ❌ Failed to get task status: {e.response.status_code}")
         
         # 5. Final statistics
         print("\n5️⃣  Final statistics...")
-        response = requests.get(f"{BASE_URL}/tasks/stats")
+        response = STATS_CACHE.get(f"{BASE_URL}/tasks/stats")
         if response.status_code == 200:
             stats = response.json()
             print(f"   📊 Running tasks: {stats['running_tasks']}")
@@ -84,18 +127,20 @@ def main():
     
     # 6. Show all recent tasks
     print("\n6️⃣  Recent tasks...")
-    response = requests.get(f"{BASE_URL}/tasks/all?limit=5")
-    if response.status_code == 200:
-        tasks = response.json()["tasks"]
-        print(f"   📋 Showing {len(tasks)} recent tasks:")
-        for task in tasks:
-            print(f"      • {task['task_id'][:8]}... - {task['status']} - {task['created_at']}")
+    with SESSION.get(f"{BASE_URL}/tasks/all?limit=5", stream=True) as response:
+        if response.status_code == 200:
+            # Parse tasks as they arrive instead of loading the whole listing
+            response.raw.decode_content = True
+            print("   📋 Recent tasks:")
+            for task in ijson.items(response.raw, "tasks.item"):
+                print(f"      • {task['task_id'][:8]}... - {task['status']} - {task['created_at']}")
     
     print("\n✅ Demo completed!")
     print("\n💡 Try these commands:")
     print("   curl -X GET 'http://localhost:8000/tasks/count/running'")
     print("   curl -X GET 'http://localhost:8000/tasks/stats'")
     print("   curl -X GET 'http://localhost:8000/tasks/running'")
+    print("   curl -N 'http://localhost:8000/tasks/<task_id>/stream'")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
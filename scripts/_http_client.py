@@ -0,0 +1,39 @@
+"""
+Shared HTTP client helpers for the API scripts and examples
+
+One pooled requests.Session for every call, an ETag cache for endpoints that
+are polled repeatedly, and a helper that sends bare YouTube video IDs.
+"""
+
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Sessions keep connections alive; a small pool covers the scripts' parallel calls
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+class ETagCache:
+    """Revalidate repeated GETs with If-None-Match and reuse the last body on 304"""
+
+    def __init__(self, session):
+        self._session = session
+        self._responses = {}
+
+    def get(self, url):
+        cached = self._responses.get(url)
+        headers = {"If-None-Match": cached.headers["ETag"]} if cached is not None else {}
+        response = self._session.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            return cached
+        if response.status_code == 200 and "ETag" in response.headers:
+            self._responses[url] = response
+        return response
+
+_YTID_RE = re.compile(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})")
+
+def youtube_id(url):
+    """Send bare video IDs so the server does not have to parse URLs"""
+    match = _YTID_RE.search(url)
+    return match.group(1) if match else url
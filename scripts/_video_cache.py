@@ -0,0 +1,39 @@
+"""
+Shared YouTube fetch cache for the demo scripts
+
+Fetching a video (metadata, transcript, entity extraction and embeddings) is by
+far the slowest step of the logging demos, and they all use the same sample
+video. Results are memoized in-process, so each run still fetches, and logs,
+every video once.
+"""
+
+import functools
+import threading
+
+from src.ingest.youtube import YouTubeVideoSource
+
+_source = None
+_source_lock = threading.Lock()
+
+# One lock per video ID so concurrent misses for the same video fetch it once
+_fetch_locks = {}
+_fetch_locks_lock = threading.Lock()
+
+def _video_source():
+    """Create the YouTube source once; it loads spaCy and the vector store"""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = YouTubeVideoSource()
+        return _source
+
+@functools.lru_cache(maxsize=64)
+def _fetch(video_id: str) -> list:
+    return list(_video_source().fetch_video([video_id]))
+
+def cached_fetch(video_id: str) -> list:
+    """Return the fetched video items for a video ID, fetching at most once"""
+    with _fetch_locks_lock:
+        lock = _fetch_locks.setdefault(video_id, threading.Lock())
+    with lock:
+        return _fetch(video_id)
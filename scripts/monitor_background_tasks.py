@@ -12,27 +12,49 @@ It can be used to:
 
 import sys
 import os
-import time
-import subprocess
-import threading
+import asyncio
+import logging
+import logging.handlers
 import queue
-from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.bootstrap.logger import get_logger, enable_debug_logging, enable_info_logging
 from src.worker.ingest_worker import main as worker_main
-from src.ingest.youtube import YouTubeVideoSource
+from _video_cache import cached_fetch
 
 logger = get_logger("background_monitor")
 
+_LOG_EXAMPLE_TEMPLATE = "[2024-01-15 10:30:{sec:02d}] {lvl} {src}: {msg}"
+_LOG_EXAMPLES = [
+    (15, "INFO", "api.ingest", "Received ingest request: videos=['dQw4w9WgXcQ']"),
+    (15, "INFO", "api.ingest", "Queuing background task: ['python', '-m', 'src.worker.ingest_worker', '--videos', 'dQw4w9WgXcQ']"),
+    (16, "INFO", "ingest_worker", "[JOB] YouTube ingestion started"),
+    (16, "INFO", "youtube_strategy", "Starting YouTube ingestion for 1 items"),
+    (16, "INFO", "youtube_strategy", "Extracted video IDs: ['dQw4w9WgXcQ']"),
+    (17, "INFO", "youtube", "[1/1] Processing video: dQw4w9WgXcQ"),
+    (17, "INFO", "youtube", "[dQw4w9WgXcQ] Step 1/5: Extracting video metadata..."),
+    (18, "INFO", "youtube", "[dQw4w9WgXcQ] Step 2/5: Retrieving transcript..."),
+    (19, "INFO", "youtube", "[dQw4w9WgXcQ] Step 3/5: Processing temporal segments..."),
+    (20, "INFO", "youtube", "[dQw4w9WgXcQ] Step 5/5: Video processing completed in 4.23s"),
+    (20, "INFO", "ingest_worker", "[JOB] YouTube ingestion finished"),
+    (20, "INFO", "ingest_worker", "[JOB] IngestWorker finished successfully"),
+]
+# Rendered once at import; show_log_examples writes it in a single call
+_LOG_EXAMPLES_TEXT = "".join(
+    _LOG_EXAMPLE_TEMPLATE.format_map({"sec": sec, "lvl": lvl, "src": src, "msg": msg}) + "\n"
+    for sec, lvl, src, msg in _LOG_EXAMPLES
+)
+
 class BackgroundTaskMonitor:
     """Monitor background tasks and their logs"""
     
     def __init__(self):
-        self.log_queue = queue.Queue()
-        self.is_monitoring = False
+        self.log_queue = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(self.log_queue)
+        self._listener = None
+        self._root_handlers = []
     
     def start_monitoring(self, log_level="INFO"):
         """Start monitoring background tasks"""
@@ -44,29 +66,38 @@ class BackgroundTaskMonitor:
         else:
             enable_info_logging()
         
-        self.is_monitoring = True
-        
-        # Start log consumer thread
-        log_thread = threading.Thread(target=self._consume_logs)
-        log_thread.daemon = True
-        log_thread.start()
+        # Route every record through the queue; the listener thread writes them
+        # with the original handlers so workers never block on stdout
+        root = logging.getLogger()
+        self._root_handlers = root.handlers[:]
+        root.handlers = [self._queue_handler]
+        self._listener = logging.handlers.QueueListener(
+            self.log_queue, *self._root_handlers, respect_handler_level=True
+        )
+        self._listener.start()
         
         return self
     
-    def _consume_logs(self):
-        """Consume logs from the queue and print them"""
-        while self.is_monitoring:
-            try:
-                log_entry = self.log_queue.get(timeout=1)
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] {log_entry}")
-            except queue.Empty:
-                continue
+    async def _process_video(self, video_id):
+        """Fetch one video and log what the background task would see"""
+        for video_item in await asyncio.to_thread(cached_fetch, video_id):
+            logger.info(f"Video processed: {video_item.title}")
+            logger.info(f"Segments: {len(video_item.segments)}")
+            logger.info(f"Duration: {video_item.duration:.1f}s")
+            
+            # Log segment processing
+            for i, segment in enumerate(video_item.segments[:3], 1):
+                logger.debug(f"Segment {i}: {segment.start_time:.1f}s - {segment.end_time:.1f}s")
+                if segment.entities:
+                    logger.debug(f"  Entities: {segment.entities}")
     
-    def test_background_task_logging(self, video_id="dQw4w9WgXcQ"):
-        """Test background task logging with a sample video"""
+    async def test_background_task_logging(self, video_ids=None):
+        """Test background task logging with sample videos, fetched concurrently"""
+        if not video_ids:
+            video_ids = ["dQw4w9WgXcQ"]
+        
         print(f"\n🎬 Testing Background Task Logging")
-        print(f"Video ID: {video_id}")
+        print(f"Video IDs: {video_ids}")
         print("-" * 40)
         
         try:
@@ -74,26 +105,14 @@ class BackgroundTaskMonitor:
             logger.info("Starting background task test")
             
             # Test video processing
-            video_source = YouTubeVideoSource()
-            for video_item in video_source.fetch_video([video_id]):
-                logger.info(f"Video processed: {video_item.title}")
-                logger.info(f"Segments: {len(video_item.segments)}")
-                logger.info(f"Duration: {video_item.duration:.1f}s")
-                
-                # Log segment processing
-                for i, segment in enumerate(video_item.segments[:3], 1):
-                    logger.debug(f"Segment {i}: {segment.start_time:.1f}s - {segment.end_time:.1f}s")
-                    if segment.entities:
-                        logger.debug(f"  Entities: {segment.entities}")
-                
-                break  # Just process first video for demo
+            await asyncio.gather(*(self._process_video(vid) for vid in video_ids))
             
             logger.info("Background task test completed successfully")
             
         except Exception as e:
             logger.error(f"Background task test failed: {e}")
     
-    def monitor_worker_execution(self, video_urls=None):
+    async def monitor_worker_execution(self, video_urls=None):
         """Monitor actual worker execution"""
         if not video_urls:
             video_urls = ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]
@@ -106,9 +125,9 @@ class BackgroundTaskMonitor:
             # Set up worker arguments
             sys.argv = ["worker"] + ["--videos"] + video_urls
             
-            # Execute worker
+            # Execute worker off the event loop so log consumption keeps running
             logger.info("Starting worker execution")
-            worker_main()
+            await asyncio.to_thread(worker_main)
             logger.info("Worker execution completed")
             
         except Exception as e:
@@ -119,31 +138,19 @@ class BackgroundTaskMonitor:
         print("\n📋 Background Task Log Examples")
         print("=" * 40)
         
-        examples = [
-            "[2024-01-15 10:30:15] INFO api.ingest: Received ingest request: videos=['dQw4w9WgXcQ']",
-            "[2024-01-15 10:30:15] INFO api.ingest: Queuing background task: ['python', '-m', 'src.worker.ingest_worker', '--videos', 'dQw4w9WgXcQ']",
-            "[2024-01-15 10:30:16] INFO ingest_worker: [JOB] YouTube ingestion started",
-            "[2024-01-15 10:30:16] INFO youtube_strategy: Starting YouTube ingestion for 1 items",
-            "[2024-01-15 10:30:16] INFO youtube_strategy: Extracted video IDs: ['dQw4w9WgXcQ']",
-            "[2024-01-15 10:30:17] INFO youtube: [1/1] Processing video: dQw4w9WgXcQ",
-            "[2024-01-15 10:30:17] INFO youtube: [dQw4w9WgXcQ] Step 1/5: Extracting video metadata...",
-            "[2024-01-15 10:30:18] INFO youtube: [dQw4w9WgXcQ] Step 2/5: Retrieving transcript...",
-            "[2024-01-15 10:30:19] INFO youtube: [dQw4w9WgXcQ] Step 3/5: Processing temporal segments...",
-            "[2024-01-15 10:30:20] INFO youtube: [dQw4w9WgXcQ] Step 5/5: Video processing completed in 4.23s",
-            "[2024-01-15 10:30:20] INFO ingest_worker: [JOB] YouTube ingestion finished",
-            "[2024-01-15 10:30:20] INFO ingest_worker: [JOB] IngestWorker finished successfully"
-        ]
-        
-        for example in examples:
-            print(example)
+        sys.stdout.write(_LOG_EXAMPLES_TEXT)
     
     def stop_monitoring(self):
         """Stop monitoring background tasks"""
-        self.is_monitoring = False
+        if self._listener:
+            # Drains queued records before returning
+            self._listener.stop()
+            self._listener = None
+            logging.getLogger().handlers = self._root_handlers
         print("\n🛑 Background Task Monitor stopped")
 
-def main():
-    """Main function to run the background task monitor"""
+async def amain():
+    """Run the background task monitor demo on a single event loop"""
     print("Background Task Monitor")
     print("=" * 50)
     print("This script helps you monitor and print background task logs.")
@@ -162,13 +169,13 @@ def main():
     # Test with INFO level
     print("\n1. Testing with INFO level logging:")
     monitor.start_monitoring("INFO")
-    monitor.test_background_task_logging()
+    await monitor.test_background_task_logging()
     monitor.stop_monitoring()
     
     # Test with DEBUG level
     print("\n2. Testing with DEBUG level logging:")
     monitor.start_monitoring("DEBUG")
-    monitor.test_background_task_logging()
+    await monitor.test_background_task_logging()
     monitor.stop_monitoring()
     
     print("\n" + "=" * 50)
@@ -181,5 +188,9 @@ def main():
     print("\nTo test worker directly:")
     print("python -m src.worker.ingest_worker --videos dQw4w9WgXcQ")
 
+def main():
+    """Main function to run the background task monitor"""
+    asyncio.run(amain())
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -4,9 +4,9 @@ Test script for the delete APIs
 Tests both vector store and knowledge graph deletion endpoints
 """
 
-import requests
 import json
 import time
+from _http_client import SESSION
 
 BASE_URL = "http://localhost:8000"
 
@@ -16,14 +16,14 @@ def test_vector_store_delete():
     
     # First check current document count
     try:
-        response = requests.get(f"{BASE_URL}/search?query=test&k=1")
+        response = SESSION.get(f"{BASE_URL}/search?query=test&k=1")
         print(f"   Search response status: {response.status_code}")
     except Exception as e:
         print(f"   ⚠️  Could not test search: {e}")
     
     # Delete all documents
     try:
-        response = requests.delete(f"{BASE_URL}/search")
+        response = SESSION.delete(f"{BASE_URL}/search")
         print(f"   Delete response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -43,7 +43,7 @@ def test_knowledge_graph_delete():
     
     # First check current graph state
     try:
-        response = requests.get(f"{BASE_URL}/graph/debug")
+        response = SESSION.get(f"{BASE_URL}/graph/debug")
         print(f"   Debug response status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -53,7 +53,7 @@ def test_knowledge_graph_delete():
     
     # Delete all graph data
     try:
-        response = requests.delete(f"{BASE_URL}/graph")
+        response = SESSION.delete(f"{BASE_URL}/graph")
         print(f"   Delete response status: {response.status_code}")
         
         if response.status_code == 200:
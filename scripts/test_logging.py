@@ -7,28 +7,50 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.ingest.youtube import YouTubeVideoSource
 from src.rag.temporal_search import get_temporal_search_service, TemporalSearchQuery
 from src.bootstrap.logger import get_logger
+from _video_cache import cached_fetch
+import asyncio
 import time
 
 logger = get_logger("test_logging")
 
+# Keep concurrent YouTube fetches low enough to avoid rate limiting
+MAX_CONCURRENT_FETCHES = 8
+
+_SERVICE = None
+
+def _svc():
+    """Create the temporal search service once and share it between the tests"""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = get_temporal_search_service()
+    return _SERVICE
+
+async def _fetch_one(video_id, semaphore):
+    """Fetch a single video in the default executor"""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, cached_fetch, video_id)
+
+async def _fetch_all(video_ids):
+    """Fetch several videos concurrently, returning items in the order of video_ids"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    results = await asyncio.gather(*(_fetch_one(vid, semaphore) for vid in video_ids))
+    return [item for items in results for item in items]
+
 def test_video_ingestion_logging():
     """Test video ingestion with detailed logging"""
     print("=== Testing Video Ingestion Logging ===")
     
-    # Example YouTube video ID
-    video_id = "dQw4w9WgXcQ"
+    # Example YouTube video IDs
+    video_ids = ["dQw4w9WgXcQ"]
     
-    print(f"Starting video ingestion for: {video_id}")
+    print(f"Starting video ingestion for: {', '.join(video_ids)}")
     
     try:
-        # Create video source
-        video_source = YouTubeVideoSource()
-        
         # Fetch video content
-        for video_item in video_source.fetch_video([video_id]):
+        for video_item in asyncio.run(_fetch_all(video_ids)):
             print(f"\n✅ Video processed successfully!")
             print(f"   Title: {video_item.title}")
             print(f"   Duration: {video_item.duration:.1f}s")
@@ -42,8 +64,6 @@ def test_video_ingestion_logging():
             print(f"   Unique entities found: {len(unique_entities)}")
             if unique_entities:
                 print(f"   Entities: {', '.join(unique_entities[:10])}...")
-            
-            break  # Just process first video for demo
         
     except Exception as e:
         print(f"❌ Error during video ingestion: {e}")
@@ -53,7 +73,7 @@ def test_temporal_search_logging():
     """Test temporal search with detailed logging"""
     print("\n=== Testing Temporal Search Logging ===")
     
-    service = get_temporal_search_service()
+    service = _svc()
     if not service:
         print("❌ Temporal search service not available")
         return
@@ -88,7 +108,7 @@ def test_entity_search_logging():
     """Test entity search with detailed logging"""
     print("\n=== Testing Entity Search Logging ===")
     
-    service = get_temporal_search_service()
+    service = _svc()
     if not service:
         print("❌ Temporal search service not available")
         return
@@ -117,7 +137,7 @@ def test_video_timeline_logging():
     """Test video timeline with detailed logging"""
     print("\n=== Testing Video Timeline Logging ===")
     
-    service = get_temporal_search_service()
+    service = _svc()
     if not service:
         print("❌ Temporal search service not available")
         return
@@ -8,119 +8,231 @@ This script demonstrates the new task monitoring functionality by:
 3. Monitoring running tasks
 """
 
+import asyncio
+import sys
 import requests
 import time
 import json
+import websockets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from _http_client import SESSION, ETagCache, youtube_id
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BASE_URL = "http://localhost:8000"
+WS_BASE_URL = BASE_URL.replace("http://", "ws://", 1)
+
+STATS_CACHE = ETagCache(SESSION)
+
+def _dumps(obj):
+    """Pretty-print JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
 
 def print_separator(title):
     """Print a formatted separator"""
-    print(f"\n{'='*60}")
-    print(f" {title}")
-    print(f"{'='*60}")
+    sys.stdout.write(f"\n{'='*60}\n {title}\n{'='*60}\n")
+
+def print_data(title, data):
+    """Print a formatted part of an API response that has already been parsed"""
+    sys.stdout.write(f"\n📋 {title}\n{_dumps(data)}\n")
 
 def print_response(title, response):
     """Print a formatted API response"""
-    print(f"\n📋 {title}")
-    print(f"Status Code: {response.status_code}")
+    buf = [f"\n📋 {title}\n", f"Status Code: {response.status_code}\n"]
     if response.status_code == 200:
-        print("Response:")
-        print(json.dumps(response.json(), indent=2))
+        buf.append("Response:\n")
+        buf.append(_dumps(response.json()) + "\n")
     else:
-        print(f"Error: {response.text}")
+        buf.append(f"Error: {response.text}\n")
+    sys.stdout.write("".join(buf))
+
+class InFlightPoller:
+    """Poll a URL with at most one request in flight, backing off while the status is unchanged"""
+    
+    def __init__(self, url, min_interval=1.0, max_interval=30.0):
+        self.url = url
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        self._last_status = None
+    
+    def tick(self):
+        """Collect the previous response if it arrived and send the next request.
+        
+        Returns the task data of the collected response, or None if the previous
+        request is still in flight or failed.
+        """
+        task_data = None
+        if self._pending is not None:
+            if not self._pending.done():
+                return None
+            task_data = self._handle(self._pending.result())
+        self._pending = self._executor.submit(SESSION.get, self.url)
+        return task_data
+    
+    def _handle(self, response):
+        if response.status_code != 200:
+            print(f"   ❌ Failed to get task status: {response.status_code}")
+            return None
+        task_data = response.json()
+        status = task_data.get("status")
+        if status == self._last_status:
+            self.interval = min(self.interval * 1.5, self.max_interval)
+        else:
+            self.interval = self.min_interval
+        self._last_status = status
+        return task_data
+    
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def poll_task(task_id, timeout=60.0):
+    """Follow a task by polling, for servers without the WebSocket endpoint"""
+    poller = InFlightPoller(f"{BASE_URL}/tasks/{task_id}")
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            task_data = poller.tick()
+            if task_data:
+                status = task_data.get("status")
+                print(f"\n⏳ Progress check (next in {poller.interval:.1f}s)...")
+                print(f"   Status: {status}")
+                print(f"   Progress: {task_data.get('progress') or 'No progress info'}")
+                if status in ["completed", "failed", "cancelled"]:
+                    print(f"   ✅ Task finished with status: {status}")
+                    return task_data
+            time.sleep(poller.interval)
+        print(f"   ⚠️  Task still running after {timeout:.0f}s")
+    finally:
+        poller.close()
+
+async def watch_task(task_id):
+    """Follow a task over the WebSocket endpoint until it finishes"""
+    state = {}
+    async with websockets.connect(f"{WS_BASE_URL}/ws/tasks/{task_id}") as ws:
+        async for message in ws:
+            # The server only sends the fields that changed since the last message
+            delta = json.loads(message)
+            state.update(delta)
+            changed = ", ".join(k for k in delta if k != "task_id")
+            print(f"\n⏳ Update ({changed})")
+            print(f"   Status: {state.get('status')}")
+            print(f"   Progress: {state.get('progress') or 'No progress info'}")
+            
+            if state.get("status") in ["completed", "failed", "cancelled"]:
+                print(f"   ✅ Task finished with status: {state['status']}")
+                break
+    return state
 
 def test_task_monitoring():
     """Test the task monitoring API"""
     print_separator("Task Monitoring API Test")
+    task_ids = []
     
-    # 1. Check initial task statistics
-    print_separator("1. Initial Task Statistics")
-    response = requests.get(f"{BASE_URL}/tasks/stats")
-    print_response("Task Statistics", response)
-    
-    # 2. Check running tasks (should be empty initially)
-    print_separator("2. Check Running Tasks")
-    response = requests.get(f"{BASE_URL}/tasks/running")
-    print_response("Running Tasks", response)
-    
-    # 3. Check pending tasks (should be empty initially)
-    print_separator("3. Check Pending Tasks")
-    response = requests.get(f"{BASE_URL}/tasks/pending")
-    print_response("Pending Tasks", response)
+    # 1-3. Statistics, running and pending tasks from a single snapshot request
+    response = SESSION.get(f"{BASE_URL}/tasks/snapshot")
+    if response.status_code == 200:
+        snapshot = response.json()
+        
+        # 1. Check initial task statistics
+        print_separator("1. Initial Task Statistics")
+        print_data("Task Statistics", snapshot["stats"])
+        
+        # 2. Check running tasks (should be empty initially)
+        print_separator("2. Check Running Tasks")
+        print_data("Running Tasks", snapshot["running"])
+        
+        # 3. Check pending tasks (should be empty initially)
+        print_separator("3. Check Pending Tasks")
+        print_data("Pending Tasks", snapshot["pending"])
+    else:
+        print_separator("1-3. Initial Task Snapshot")
+        print_response("Task Snapshot", response)
     
     # 4. Trigger a background task (ingest)
     print_separator("4. Trigger Background Task")
     ingest_data = {
-        "videos": ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]
+        "videos": [youtube_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ")]
     }
-    response = requests.post(f"{BASE_URL}/ingest", json=ingest_data)
+    response = SESSION.post(f"{BASE_URL}/ingest", json=ingest_data)
     print_response("Ingest Request", response)
     
     if response.status_code == 200:
         task_id = response.json().get("task_id")
+        task_ids.append(task_id)
         print(f"🎯 Task ID: {task_id}")
         
         # 5. Check task status immediately
         print_separator("5. Check Task Status")
         time.sleep(1)  # Give it a moment to start
-        response = requests.get(f"{BASE_URL}/tasks/{task_id}")
+        response = SESSION.get(f"{BASE_URL}/tasks/{task_id}")
         print_response(f"Task Status for {task_id}", response)
         
-        # 6. Check running tasks again
-        print_separator("6. Check Running Tasks After Trigger")
-        response = requests.get(f"{BASE_URL}/tasks/running")
-        print_response("Running Tasks", response)
-        
-        # 7. Check task count
-        print_separator("7. Check Running Task Count")
-        response = requests.get(f"{BASE_URL}/tasks/count/running")
-        print_response("Running Task Count", response)
+        # 6-7. Running tasks and their count from a single snapshot request
+        response = SESSION.get(f"{BASE_URL}/tasks/snapshot")
+        if response.status_code == 200:
+            running = response.json()["running"]
+            
+            # 6. Check running tasks again
+            print_separator("6. Check Running Tasks After Trigger")
+            print_data("Running Tasks", running)
+            
+            # 7. Check task count
+            print_separator("7. Check Running Task Count")
+            print_data("Running Task Count", {"running_tasks": running["total_count"]})
+        else:
+            print_separator("6-7. Task Snapshot After Trigger")
+            print_response("Task Snapshot", response)
         
         # 8. Monitor task progress
         print_separator("8. Monitor Task Progress")
-        for i in range(5):
-            print(f"\n⏳ Progress check {i+1}/5...")
-            response = requests.get(f"{BASE_URL}/tasks/{task_id}")
-            if response.status_code == 200:
-                task_data = response.json()
-                status = task_data.get("status")
-                progress = task_data.get("progress", "No progress info")
-                print(f"   Status: {status}")
-                print(f"   Progress: {progress}")
-                
-                if status in ["completed", "failed"]:
-                    print(f"   ✅ Task finished with status: {status}")
-                    break
-            else:
-                print(f"   ❌ Failed to get task status: {response.status_code}")
-            
-            time.sleep(2)
+        try:
+            asyncio.run(watch_task(task_id))
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            print(f"   ⚠️  WebSocket unavailable ({e}), falling back to polling")
+            poll_task(task_id)
         
         # 9. Check final statistics
         print_separator("9. Final Task Statistics")
-        response = requests.get(f"{BASE_URL}/tasks/stats")
+        response = STATS_CACHE.get(f"{BASE_URL}/tasks/stats")
         print_response("Final Task Statistics", response)
         
         # 10. Check all tasks
         print_separator("10. All Tasks")
-        response = requests.get(f"{BASE_URL}/tasks/all?limit=10")
+        response = SESSION.get(f"{BASE_URL}/tasks/all?limit=10")
         print_response("All Tasks (limit 10)", response)
     
-    # 11. Test temporal video ingest
-    print_separator("11. Test Temporal Video Ingest")
-    temporal_data = {
-        "video_ids": ["dQw4w9WgXcQ", "9bZkp7q19f0"],
-        "process_segments": True,
-        "segment_duration": 30.0
+    # 11. Trigger a second ingest task
+    print_separator("11. Trigger Second Background Task")
+    ingest_data = {
+        "videos": [youtube_id("https://www.youtube.com/watch?v=9bZkp7q19f0")]
     }
-    response = requests.post(f"{BASE_URL}/temporal/ingest-video", json=temporal_data)
-    print_response("Temporal Video Ingest", response)
+    response = SESSION.post(f"{BASE_URL}/ingest", json=ingest_data)
+    print_response("Second Ingest Request", response)
+    if response.status_code == 200 and response.json().get("task_id"):
+        task_ids.append(response.json()["task_id"])
+    
+    # 12. Check status of every task started by this test in one round-trip
+    print_separator("12. Tracked Task Statuses")
+    if len(task_ids) > 1:
+        response = SESSION.post(f"{BASE_URL}/tasks/statuses", json={"task_ids": task_ids})
+        print_response(f"Task Statuses ({len(task_ids)} tasks)", response)
+    elif task_ids:
+        response = SESSION.get(f"{BASE_URL}/tasks/{task_ids[0]}")
+        print_response(f"Task Status for {task_ids[0]}", response)
+    else:
+        print("No tasks were started")
     
-    # 12. Final statistics
-    print_separator("12. Final Statistics After All Tests")
-    response = requests.get(f"{BASE_URL}/tasks/stats")
+    # 13. Final statistics
+    print_separator("13. Final Statistics After All Tests")
+    response = STATS_CACHE.get(f"{BASE_URL}/tasks/stats")
     print_response("Final Statistics", response)
 
 def test_error_handling():
@@ -129,12 +241,12 @@ def test_error_handling():
     
     # Test non-existent task
     print("\n🔍 Testing non-existent task...")
-    response = requests.get(f"{BASE_URL}/tasks/non-existent-task-id")
+    response = SESSION.get(f"{BASE_URL}/tasks/non-existent-task-id")
     print_response("Non-existent Task", response)
     
     # Test invalid task ID format
     print("\n🔍 Testing invalid task ID...")
-    response = requests.get(f"{BASE_URL}/tasks/invalid-id")
+    response = SESSION.get(f"{BASE_URL}/tasks/invalid-id")
     print_response("Invalid Task ID", response)
 
 def main():
@@ -153,16 +265,18 @@ def main():
         print_separator("Test Summary")
         print("✅ Task monitoring API tests completed!")
         print("\n📊 Available endpoints tested:")
+        print("   - GET /tasks/snapshot - Statistics, running and pending tasks")
         print("   - GET /tasks/stats - Task statistics")
         print("   - GET /tasks/running - Running tasks")
         print("   - GET /tasks/pending - Pending tasks")
         print("   - GET /tasks/all - All tasks")
         print("   - GET /tasks/{task_id} - Specific task status")
+        print("   - POST /tasks/statuses - Batch task status")
+        print("   - WS /ws/tasks/{task_id} - Task status updates")
         print("   - GET /tasks/count/running - Running task count")
         print("   - DELETE /tasks/cleanup - Cleanup old tasks")
         print("\n🎯 Integration points tested:")
         print("   - POST /ingest - Ingest with task tracking")
-        print("   - POST /temporal/ingest-video - Temporal ingest with task tracking")
         
     except requests.exceptions.ConnectionError:
         print("❌ Error: Could not connect to the API server")
@@ -7,9 +7,6 @@ This script provides a simple way to view background task logs in real-time.
 
 import sys
 import os
-import time
-import subprocess
-from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -1,12 +1,35 @@
-import pandas as pd
-from sqlalchemy import create_engine
+from contextlib import closing
+from datetime import date
+from functools import lru_cache
+import io
+import numpy as np
+import psycopg2
+from pgvector.psycopg2 import register_vector
 import umap
+try:
+    from cuml.manifold import UMAP as cuUMAP
+    import cupy
+except ImportError:
+    cuUMAP = None
+import matplotlib
+matplotlib.use("Agg")  # headless: render to PNG without a GUI event loop
 import matplotlib.pyplot as plt
 from src.bootstrap.settings import get_settings
 
-def load_monthly_centroids():
+def _connect():
     settings = get_settings()
-    engine = create_engine(settings.vectordb_uri)
+    # psycopg2 takes a plain libpq URI, not the SQLAlchemy dialect form
+    dsn = settings.vectordb_uri.replace("postgresql+psycopg2://", "postgresql://", 1)
+    return closing(psycopg2.connect(dsn))
+
+def _count_chunks() -> int:
+    with _connect() as conn, conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM content_chunks;")
+        return cur.fetchone()[0]
+
+@lru_cache(maxsize=4)
+def _monthly_centroids(day: date, nrows: int):
+    """Run the GROUP BY scan; cached per (day, row count) so repeat renders skip it"""
     query = """
     SELECT date_trunc('month', created_at) AS month,
            AVG(embedding) AS centroid
@@ -14,18 +37,63 @@ def load_monthly_centroids():
     GROUP BY 1
     ORDER BY 1;
     """
-    return pd.read_sql_query(query, engine)
-
-def plot_umap(df):
-    reducer = umap.UMAP(metric='cosine')
-    coords = reducer.fit_transform(list(df['centroid']))
-    plt.figure(figsize=(8,6))
-    plt.scatter(coords[:,0], coords[:,1])
-    for (x,y), label in zip(coords, df['month'].dt.strftime('%Y-%m')):
-        plt.text(x, y, label)
-    plt.title("Topic drift map")
-    plt.show()
+    with _connect() as conn:
+        # pgvector's codec decodes avg(embedding) straight into an ndarray
+        register_vector(conn)
+        with conn.cursor() as cur:
+            cur.execute(query)
+            rows = cur.fetchall()
+
+    months = np.array([month.replace(tzinfo=None) for month, _ in rows], dtype='datetime64[M]')
+    dim = len(rows[0][1]) if rows else 0
+    centroids = np.empty((len(rows), dim), dtype=np.float32)
+    for i, (_, centroid) in enumerate(rows):
+        centroids[i] = centroid
+    # Shared by every caller of the cache
+    months.flags.writeable = False
+    centroids.flags.writeable = False
+    return months, centroids
+
+def load_monthly_centroids():
+    """Return (months, centroids): datetime64[M] labels and a read-only float32 (N, d) matrix
+
+    Recomputed at most once a day, or sooner when rows are added to content_chunks.
+    """
+    return _monthly_centroids(date.today(), _count_chunks())
+
+@lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """Whether cuML is installed and a CUDA device is visible to it"""
+    if cuUMAP is None:
+        return False
+    try:
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except cupy.cuda.runtime.CUDARuntimeError:
+        return False
+
+def plot_umap(months, centroids) -> bytes:
+    """Render the UMAP projection of the monthly centroids and return it as PNG bytes"""
+    # Contiguous float32 matrix, L2-normalized so euclidean matches cosine
+    X = np.ascontiguousarray(centroids, dtype=np.float32)
+    # Clamped so an all-zero centroid stays zero instead of turning into NaNs
+    X = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+    if _cuda_available():
+        reducer = cuUMAP(n_neighbors=15, metric='euclidean', build_algo='brute_force_knn')
+    else:
+        reducer = umap.UMAP(metric='euclidean')
+    coords = reducer.fit_transform(X)
+    fig, ax = plt.subplots(figsize=(8,6))
+    ax.scatter(coords[:,0], coords[:,1])
+    labels = np.datetime_as_string(months, unit='M')
+    for (x, y), label in zip(coords, labels):
+        ax.annotate(label, (x, y), xycoords='data')
+    ax.set_title("Topic drift map")
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return buf.getvalue()
 
 if __name__ == "__main__":
-    df = load_monthly_centroids()
-    plot_umap(df)
+    months, centroids = load_monthly_centroids()
+    with open("topic_drift.png", "wb") as f:
+        f.write(plot_umap(months, centroids))
@@ -0,0 +1,53 @@
+"""
+In-process cache for knowledge graph reads.
+
+Entries are keyed by a graph version counter that is bumped whenever indexed
+content is written (ingest, graph or vector store delete), so stale results are
+never served after a write. The semantic search cache follows the same counter;
+the TTL only bounds how long an unchanged graph is held in memory.
+"""
+
+import threading
+from typing import Any, Hashable, Optional
+
+from cachetools import TTLCache
+
+GRAPH_CACHE_SIZE = 16
+GRAPH_CACHE_TTL_SECONDS = 60
+
+_lock = threading.RLock()
+_cache: TTLCache = TTLCache(maxsize=GRAPH_CACHE_SIZE, ttl=GRAPH_CACHE_TTL_SECONDS)
+_graph_version = 0
+
+
+def graph_version() -> int:
+    """Return the current graph version"""
+    with _lock:
+        return _graph_version
+
+
+def graph_cache_key(name: str) -> tuple:
+    """Build a cache key for `name` at the current graph version"""
+    with _lock:
+        return (_graph_version, name)
+
+
+def get_cached(key: Hashable) -> Optional[Any]:
+    """Return the cached value for key, or None on a miss"""
+    with _lock:
+        return _cache.get(key)
+
+
+def set_cached(key: Hashable, value: Any) -> None:
+    """Store value under key; writes for an outdated graph version are dropped"""
+    with _lock:
+        if key[0] == _graph_version:
+            _cache[key] = value
+
+
+def bump_graph_version() -> None:
+    """Invalidate every cached graph read after the graph has been written"""
+    global _graph_version
+    with _lock:
+        _graph_version += 1
+        _cache.clear()
@@ -0,0 +1,38 @@
+"""
+HTTP revalidation helpers for endpoints that dashboards poll.
+
+Responses carry a strong ETag over their JSON body and, optionally, a
+Cache-Control header, so clients and intermediaries can reuse an unchanged
+value or revalidate it with If-None-Match and get an empty 304.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+
+# Polled counters change often; let clients reuse a value for a couple of seconds
+STATS_CACHE_CONTROL = "public, max-age=2"
+
+
+def etag_for(payload: Any) -> str:
+    """Return a strong ETag for the JSON encoding of payload"""
+    body = orjson.dumps(payload, default=str)
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def revalidate(request: Request, response: Response, payload: Any,
+               cache_control: Optional[str] = None) -> Optional[Response]:
+    """Tag response with payload's ETag and return a 304 if the client's copy is current
+
+    Endpoints return the 304 as is when one is given, and their payload otherwise.
+    """
+    etag = etag_for(payload)
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+from src.bootstrap.logger import get_logger
+from src.bootstrap.settings import settings
+
+logger = get_logger("ingest_queue")
+
+class IngestQueueFull(Exception):
+    """Raised when a job is submitted while the ingest queue is at capacity"""
+
+class IngestQueue:
+    """Run ingest jobs on a fixed pool of long-lived worker coroutines
+
+    Jobs wait in a bounded queue until a worker is free, so a burst of ingest
+    requests is worked off a few at a time instead of all starting at once.
+    """
+
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start the workers on the running event loop, if they are not already running there"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [loop.create_task(self._worker(), name=f"ingest-worker-{i}") for i in range(self.workers)]
+        logger.info("Started %s ingest workers", self.workers)
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still queued are dropped"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        logger.info("Stopped ingest workers")
+
+    def submit(self, job: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Queue job(*args) for the next free worker"""
+        self.start()
+        try:
+            self._queue.put_nowait((job, args))
+        except asyncio.QueueFull:
+            raise IngestQueueFull(f"Ingest queue is full ({self.max_queued} jobs waiting)")
+
+    def qsize(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self) -> None:
+        while True:
+            job, args = await self._queue.get()
+            try:
+                await job(*args)
+            except Exception:
+                # Jobs report their own failures to the task tracker; keep the worker alive regardless
+                logger.exception("Ingest job %s failed", getattr(job, "__name__", job))
+            finally:
+                self._queue.task_done()
+
+# Global ingest queue instance
+ingest_queue = IngestQueue(workers=settings.ingest_workers, max_queued=settings.ingest_queue_size)
+
+def get_ingest_queue() -> IngestQueue:
+    """Get the global ingest queue instance"""
+    return ingest_queue
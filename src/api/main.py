@@ -1,18 +1,86 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from src.api.routers.ingest import router as ingest_router
 from src.api.routers.entities import router as entities_router
 from src.api.routers.graph import router as graph_router
 from src.api.routers.search import router as search_router
 from src.api.routers.temporal import router as temporal_router
-from src.api.routers.tasks import router as tasks_router
+from src.api.routers.tasks import router as tasks_router, ws_router as tasks_ws_router
 from src.api.routers.llm import router as llm_router
+from src.kg.gremlin_client import get_kg, close_kg
+from src.api.ingest_queue import get_ingest_queue
+from src.rag.batcher import get_embedding_batcher
+from src.rag.vector_store import get_vectorstore
+from src.bootstrap.logger import get_logger
+import asyncio
+
+logger = get_logger("api.main")
+
+# Idle Gremlin websockets get dropped by load balancers; ping well inside that window
+KG_KEEPALIVE_SECONDS = 30.0
+
+def _warm_backends():
+    """Open the Gremlin pool and the shared vector store before the first request needs them"""
+    try:
+        kg = get_kg()
+        logger.info("Knowledge graph warmed: %s nodes", kg.get_node_count())
+    except Exception as e:
+        logger.warning("Knowledge graph warm-up failed: %s", e)
+    # Building the shared store connects to the database; no query is run, so no embedding is paid for
+    if get_vectorstore():
+        logger.info("Vector store warmed")
+    else:
+        logger.warning("Vector store warm-up failed")
+
+async def _keep_kg_alive():
+    """Ping Gremlin periodically so requests after an idle period skip the reconnect"""
+    while True:
+        await asyncio.sleep(KG_KEEPALIVE_SECONDS)
+        try:
+            kg = await asyncio.to_thread(get_kg)
+            await asyncio.to_thread(kg.ping)
+        except Exception as e:
+            logger.warning("Knowledge graph keep-alive failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(_warm_backends)
+    keepalive = asyncio.create_task(_keep_kg_alive())
+    get_ingest_queue().start()
+    try:
+        yield
+    finally:
+        keepalive.cancel()
+        await get_ingest_queue().stop()
+        await get_embedding_batcher().stop()
+        await asyncio.to_thread(close_kg)
+
+# Streamed responses (NDJSON, SSE, the chunked /tasks/all listing) are sent as
+# produced; gzip would buffer them and hold back the first records and events
+UNCOMPRESSED_PATH_SUFFIXES = ("/stream", "/tasks/all")
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes streaming endpoints through uncompressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].rstrip("/").endswith(UNCOMPRESSED_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
 app = FastAPI(
     title="Multimodal RAG Knowledge Graph API",
     description="API for temporal video search and knowledge graph operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Graph dumps and search results are repetitive JSON; small bodies aren't worth the CPU
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1024, compresslevel=4)
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
@@ -24,4 +92,5 @@ app.include_router(graph_router)
 app.include_router(search_router)
 app.include_router(temporal_router)
 app.include_router(tasks_router)
+app.include_router(tasks_ws_router)
 app.include_router(llm_router) 
\ No newline at end of file
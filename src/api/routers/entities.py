@@ -1,31 +1,40 @@
 from fastapi import APIRouter, HTTPException
-from src.kg.gremlin_client import GremlinKG
+from fastapi.responses import ORJSONResponse
+from src.kg.gremlin_client import get_kg
+from src.api.cache import graph_cache_key, get_cached, set_cached
 from src.bootstrap.logger import get_logger
 from typing import Dict, Any
+import asyncio
 import time
 
 router = APIRouter()
 logger = get_logger("api.entities")
 
-@router.get("/entities")
-def get_entities() -> Dict[str, Any]:
-    start_time = time.time()
+ENTITIES_TIMEOUT_SECONDS = 10.0
+
+@router.get("/entities", response_class=ORJSONResponse)
+async def get_entities() -> Dict[str, Any]:
+    start_time = time.monotonic()
     try:
         logger.info("Retrieving entities from knowledge graph...")
-        kg = GremlinKG()
-        
-        # Add timeout protection
-        timeout = 10  # 10 seconds timeout
-        if time.time() - start_time > timeout:
-            logger.warning("Entities retrieval timed out")
-            return {
-                "status": "timeout",
-                "message": "Entities retrieval timed out",
-                "entities": []
-            }
-        
-        entities = kg.get_all_entities()
-        processing_time = time.time() - start_time
+        cache_key = graph_cache_key("entities")
+        entities = get_cached(cache_key)
+        if entities is None:
+            kg = await asyncio.to_thread(get_kg)
+            try:
+                entities = await asyncio.wait_for(
+                    asyncio.to_thread(kg.get_all_entities, timeout_ms=int(ENTITIES_TIMEOUT_SECONDS * 1000)),
+                    timeout=ENTITIES_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Entities retrieval timed out")
+                return {
+                    "status": "timeout",
+                    "message": "Entities retrieval timed out",
+                    "entities": []
+                }
+            set_cached(cache_key, entities)
+        processing_time = time.monotonic() - start_time
         
         logger.info(f"Retrieved {len(entities)} entities in {processing_time:.2f}s")
         
@@ -36,7 +45,7 @@ def get_entities() -> Dict[str, Any]:
             "entities": entities
         }
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = time.monotonic() - start_time
         logger.error(f"Failed to retrieve entities after {processing_time:.2f}s: {e}")
         return {
             "status": "error",
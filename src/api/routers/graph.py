@@ -1,28 +1,67 @@
-from fastapi import APIRouter, HTTPException
-from src.kg.gremlin_client import GremlinKG
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from src.kg.gremlin_client import get_kg
+from src.api.cache import graph_cache_key, get_cached, set_cached, bump_graph_version
 from src.bootstrap.logger import get_logger
 from typing import Dict, Any
+import asyncio
+import orjson
 import time
 
 router = APIRouter(prefix="/graph", tags=["graph"])
 logger = get_logger("api.graph")
 
-@router.get("")
-def get_graph():
+async def _load_graph() -> Dict[str, Any]:
+    """Return the whole graph, served from the cache until the graph changes"""
+    cache_key = graph_cache_key("graph")
+    graph = get_cached(cache_key)
+    if graph is None:
+        kg = await asyncio.to_thread(get_kg)
+        graph = await asyncio.to_thread(kg.get_whole_graph)
+        set_cached(cache_key, graph)
+    return graph
+
+@router.get("", response_class=ORJSONResponse)
+async def get_graph():
     try:
-        kg = GremlinKG()
-        graph = kg.get_whole_graph()
-        return graph
+        # Serialize once per graph version; cache hits skip encoding entirely
+        cache_key = graph_cache_key("graph.json")
+        body = get_cached(cache_key)
+        if body is None:
+            body = orjson.dumps(await _load_graph(), default=str)
+            set_cached(cache_key, body)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Failed to get graph: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get graph: {e}")
 
-@router.get("/debug")
-def debug_graph():
+@router.get("/stream")
+async def stream_graph():
+    """Stream the graph as NDJSON: one node or edge object per line, tagged by "type".
+
+    Nodes and edges are read from Gremlin page by page, so memory stays bounded by
+    the page size and the first records go out before the whole graph is read.
+    """
+    try:
+        kg = await asyncio.to_thread(get_kg)
+    except Exception as e:
+        logger.error(f"Failed to stream graph: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to stream graph: {e}")
+
+    # A sync generator: StreamingResponse iterates it in the threadpool
+    def records():
+        for node in kg.iter_nodes():
+            yield orjson.dumps({"type": "node", **node}, default=str) + b"\n"
+        for edge in kg.iter_edges():
+            yield orjson.dumps({"type": "edge", **edge}, default=str) + b"\n"
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+@router.get("/debug", response_class=ORJSONResponse)
+async def debug_graph():
     """Return the number of nodes and a sample of nodes for debugging."""
     try:
-        kg = GremlinKG()
-        graph = kg.get_whole_graph()
+        graph = await _load_graph()
         nodes = graph.get("nodes", [])
         return {
             "node_count": len(nodes),
@@ -34,21 +73,23 @@ def debug_graph():
         raise HTTPException(status_code=500, detail=f"Failed to debug graph: {e}")
 
 @router.delete("")
-def delete_all_graph_data() -> Dict[str, Any]:
+async def delete_all_graph_data() -> Dict[str, Any]:
     """Delete all nodes and edges from the knowledge graph."""
-    start_time = time.time()
+    start_time = time.monotonic()
     try:
         logger.info("Deleting all nodes and edges from knowledge graph...")
-        kg = GremlinKG()
+        kg = await asyncio.to_thread(get_kg)
         
         # Get counts before deletion
-        before_node_count = kg.get_node_count()
-        before_edge_count = kg.get_edge_count()
+        before_node_count = await asyncio.to_thread(kg.get_node_count)
+        before_edge_count = await asyncio.to_thread(kg.get_edge_count)
         
         # Delete all data
-        success = kg.delete_all()
+        success = await asyncio.to_thread(kg.delete_all)
+        # Even a failed delete may have dropped some edges or vertices
+        bump_graph_version()
         
-        processing_time = time.time() - start_time
+        processing_time = time.monotonic() - start_time
         
         if success:
             logger.info(f"All data deleted from knowledge graph in {processing_time:.2f}s")
@@ -70,7 +111,7 @@ def delete_all_graph_data() -> Dict[str, Any]:
             }
             
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = time.monotonic() - start_time
         logger.error(f"Delete operation failed after {processing_time:.2f}s: {e}")
         return {
             "status": "error",
@@ -79,20 +120,3 @@ def delete_all_graph_data() -> Dict[str, Any]:
             "deleted_edges": 0,
             "processing_time": f"{processing_time:.2f}s"
         }
-
-@router.get("/graph")
-def get_graph_old() -> Dict[str, Any]:
-    try:
-        kg = GremlinKG()
-        graph = kg.get_whole_graph()
-        return {
-            "status": "success",
-            "graph": graph
-        }
-    except Exception as e:
-        logger.error(f"Failed to retrieve graph: {e}")
-        return {
-            "status": "error",
-            "message": str(e),
-            "graph": {"nodes": [], "edges": [], "total_nodes": 0, "total_edges": 0}
-        } 
\ No newline at end of file
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-from pydantic import BaseModel
-import subprocess, sys
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
+from fastapi.responses import ORJSONResponse
+import sys
 from src.bootstrap.logger import get_logger
 from src.api.task_tracker import get_task_tracker
-from src.ingest.youtube import YouTubeVideoSource
+from src.api.ingest_queue import get_ingest_queue, IngestQueueFull
+from src.api.cache import bump_graph_version
 from src.worker.strategies.youtube import YouTubeIngestStrategy
 from src.rag.vector_store import get_vectorstore
-from src.kg.gremlin_client import GremlinKG
+from src.kg.gremlin_client import get_kg
+from src.worker.ingest_worker import run as run_worker
+from src.bootstrap.settings import settings
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 import time
 from typing import List, Optional, Dict, Any
@@ -14,14 +19,24 @@ from typing import List, Optional, Dict, Any
 router = APIRouter()
 logger = get_logger("api.ingest")
 
+# Per-video progress is flushed to the tracker in batches of this many messages,
+# or after this many seconds, whichever comes first
+PROGRESS_FLUSH_SIZE = 8
+PROGRESS_FLUSH_SECONDS = 1.0
+
 class IngestRequest(BaseModel):
-    videos: list[str] | None = None
-    twitter: list[str] | None = None
-    ig: list[str] | None = None
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    # Bounded so one request cannot queue an unbounded batch; larger batches are split by the client
+    videos: list[str] | None = Field(default=None, max_length=settings.ingest_max_items)
+    twitter: list[str] | None = Field(default=None, max_length=settings.ingest_max_items)
+    ig: list[str] | None = Field(default=None, max_length=settings.ingest_max_items)
     process_segments: bool = True
     segment_duration: Optional[float] = 30.0
 
 class IngestResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     status: str
     message: str
     task_id: Optional[str] = None
@@ -31,69 +46,119 @@ class IngestResponse(BaseModel):
     entities_found: Optional[List[str]] = None
     duration: Optional[float] = None
 
-async def run_ingest_worker(cmd: list[str], task_id: str):
-    """Run the ingest worker and track its progress"""
+async def run_ingest_worker(cmd: list[str], task_id: str, req: IngestRequest):
+    """Run the ingest worker in-process and track its progress
+
+    `cmd` is the equivalent CLI invocation, kept for task tracking and logs.
+    """
     tracker = get_task_tracker()
     try:
         await tracker.start_task(task_id)
         await tracker.update_progress(task_id, "Starting ingest worker...")
-        logger.info(f"Starting background task {task_id}: {cmd}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            await tracker.update_progress(task_id, "Task completed successfully")
-            await tracker.complete_task(task_id, success=True)
-            logger.info(f"Background task {task_id} completed successfully")
-        else:
-            error_msg = f"Task failed with return code {result.returncode}: {result.stderr}"
-            await tracker.update_progress(task_id, f"Task failed: {error_msg}")
-            await tracker.complete_task(task_id, success=False, error_message=error_msg)
-            logger.error(f"Background task {task_id} failed: {error_msg}")
+        logger.info("Starting background task %s: %s", task_id, cmd)
+        try:
+            await asyncio.to_thread(run_worker, videos=req.videos, twitter=req.twitter, ig=req.ig)
+        finally:
+            # The worker may have written to the graph even if it failed part-way
+            bump_graph_version()
+        await tracker.complete_task(task_id, success=True, progress="Task completed successfully")
+        logger.info("Background task %s completed successfully", task_id)
     except Exception as e:
         error_msg = f"Task execution failed: {str(e)}"
-        await tracker.update_progress(task_id, f"Task execution error: {error_msg}")
-        await tracker.complete_task(task_id, success=False, error_message=error_msg)
-        logger.error(f"Background task {task_id} execution failed: {e}")
+        await tracker.complete_task(task_id, success=False, error_message=error_msg,
+                                    progress=f"Task execution error: {error_msg}")
+        logger.error("Background task %s execution failed: %s", task_id, e)
+
+async def process_videos_background(video_ids: List[str], task_id: str, process_segments: bool, segment_duration: float):
+    """Process all videos in background using YouTube ingestion strategy
 
-def process_videos_background(video_ids: List[str], task_id: str, process_segments: bool, segment_duration: float):
-    """Process all videos in background using YouTube ingestion strategy"""
+    Runs on the application's event loop; the blocking ingestion work is pushed
+    to worker threads so progress updates interleave with request handling.
+    """
     tracker = get_task_tracker()
     try:
-        asyncio.run(tracker.start_task(task_id))
-        asyncio.run(tracker.update_progress(task_id, f"Starting background processing for {len(video_ids)} videos"))
-        logger.info(f"Background processing started for {len(video_ids)} videos")
+        await tracker.start_task(task_id)
+        await tracker.update_progress(task_id, f"Starting background processing for {len(video_ids)} videos")
+        logger.info("Background processing started for %s videos", len(video_ids))
         
-        start_time = time.time()
+        start_time = time.monotonic()
         
         # Initialize vector store and knowledge graph
-        vectordb = get_vectorstore()
-        kg = GremlinKG()
+        vectordb = await asyncio.to_thread(get_vectorstore)
+        kg = await asyncio.to_thread(get_kg)
         
-        # Use YouTube ingestion strategy to process videos
+        # Use YouTube ingestion strategy to process videos; it holds no per-video
+        # state, so one instance is shared by the pool's threads
         strategy = YouTubeIngestStrategy(vectordb=vectordb, kg=kg)
         
-        for i, video_id in enumerate(video_ids, 1):
-            progress_msg = f"Processing video {i}/{len(video_ids)}: {video_id}"
-            asyncio.run(tracker.update_progress(task_id, progress_msg))
-            logger.info(f"Background processing video {i}/{len(video_ids)}: {video_id}")
-            
-            # Process single video
-            strategy.ingest([video_id])
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(max_workers=settings.ingest_concurrency, thread_name_prefix="ingest")
+        
+        async def ingest_one(video_id: str) -> tuple[str, Optional[Exception]]:
+            # Failures are returned rather than raised so one bad video doesn't abort the rest
+            try:
+                await loop.run_in_executor(pool, strategy.ingest, [video_id])
+                return video_id, None
+            except Exception as e:
+                return video_id, e
+        
+        logger.info("Background processing %s videos, %s at a time", len(video_ids), settings.ingest_concurrency)
+        pending = [asyncio.ensure_future(ingest_one(video_id)) for video_id in video_ids]
+        failed: List[str] = []
+        progress_buffer: List[str] = []
+        last_flush = time.monotonic()
+        try:
+            for i, finished in enumerate(asyncio.as_completed(pending), 1):
+                video_id, error = await finished
+                if error is None:
+                    progress_buffer.append(f"Processed video {i}/{len(video_ids)}: {video_id}")
+                    logger.info("Background processed video %s/%s: %s", i, len(video_ids), video_id)
+                else:
+                    failed.append(video_id)
+                    progress_buffer.append(f"Failed video {i}/{len(video_ids)}: {video_id}")
+                    logger.error("Background processing failed for video %s: %s", video_id, error)
+                if len(progress_buffer) >= PROGRESS_FLUSH_SIZE or time.monotonic() - last_flush > PROGRESS_FLUSH_SECONDS:
+                    await tracker.update_progress_batch(task_id, progress_buffer)
+                    progress_buffer.clear()
+                    last_flush = time.monotonic()
+            await tracker.update_progress_batch(task_id, progress_buffer)
+        finally:
+            # Don't block the event loop on shutdown; queued videos are dropped if the task is cancelled
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
         
-        background_time = time.time() - start_time
+        bump_graph_version()
+        background_time = time.monotonic() - start_time
+        if failed:
+            error_msg = f"{len(failed)}/{len(video_ids)} videos failed: {', '.join(failed)}"
+            await tracker.complete_task(task_id, success=False, error_message=error_msg,
+                                        progress=f"Background video processing finished with errors in {background_time:.2f}s")
+            logger.error("Background video processing finished in %.2fs; %s", background_time, error_msg)
+            return
         completion_msg = f"Background video processing completed in {background_time:.2f}s"
-        asyncio.run(tracker.update_progress(task_id, completion_msg))
-        asyncio.run(tracker.complete_task(task_id, success=True))
-        logger.info(f"Background video processing completed in {background_time:.2f}s")
+        await tracker.complete_task(task_id, success=True, progress=completion_msg)
+        logger.info("Background video processing completed in %.2fs", background_time)
         
     except Exception as e:
+        # Videos processed before the failure are already in the graph
+        bump_graph_version()
         error_msg = f"Background video processing failed: {e}"
-        asyncio.run(tracker.update_progress(task_id, error_msg))
-        asyncio.run(tracker.complete_task(task_id, success=False, error_message=error_msg))
-        logger.error(f"Background video processing failed: {e}")
+        await tracker.complete_task(task_id, success=False, error_message=error_msg, progress=error_msg)
+        logger.error("Background video processing failed: %s", e)
+
+async def _enqueue(task_id: str, job, *args):
+    """Hand a tracked job to the ingest workers, failing the task if the queue is full"""
+    try:
+        get_ingest_queue().submit(job, *args)
+    except IngestQueueFull as e:
+        await get_task_tracker().complete_task(task_id, success=False, error_message=str(e))
+        logger.warning("Rejected task %s: %s", task_id, e)
+        raise HTTPException(status_code=503, detail=str(e))
 
-async def process_video_ingestion(videos: List[str], process_segments: bool, segment_duration: float, bg: BackgroundTasks) -> IngestResponse:
+async def process_video_ingestion(videos: List[str], process_segments: bool, segment_duration: float) -> IngestResponse:
     """Handle video ingestion with background processing for all videos"""
-    logger.info(f"Queuing {len(videos)} videos for background processing")
+    logger.info("Queuing %s videos for background processing", len(videos))
     
     metadata = {
         "video_ids": videos,
@@ -106,8 +171,8 @@ async def process_video_ingestion(videos: List[str], process_segments: bool, seg
     cmd = ["background_video_processing", "--videos"] + videos
     task_id = await tracker.add_task(cmd, metadata=metadata)
     
-    bg.add_task(process_videos_background, videos, task_id, process_segments, segment_duration)
-    logger.info(f"Background task {task_id} queued for {len(videos)} videos")
+    await _enqueue(task_id, process_videos_background, videos, task_id, process_segments, segment_duration)
+    logger.info("Background task %s queued for %s videos", task_id, len(videos))
     
     return IngestResponse(
         status="queued",
@@ -116,7 +181,7 @@ async def process_video_ingestion(videos: List[str], process_segments: bool, seg
         cmd=cmd
     )
 
-async def process_generic_ingestion(req: IngestRequest, bg: BackgroundTasks) -> IngestResponse:
+async def process_generic_ingestion(req: IngestRequest) -> IngestResponse:
     """Handle generic ingestion (Twitter, IG, etc.)"""
     cmd = [sys.executable, "-m", "src.worker.ingest_worker"]
     if req.videos:
@@ -135,8 +200,8 @@ async def process_generic_ingestion(req: IngestRequest, bg: BackgroundTasks) ->
     
     tracker = get_task_tracker()
     task_id = await tracker.add_task(cmd, metadata=metadata)
-    logger.info(f"Queuing background task {task_id}: {cmd}")
-    bg.add_task(run_ingest_worker, cmd, task_id)
+    logger.info("Queuing background task %s: %s", task_id, cmd)
+    await _enqueue(task_id, run_ingest_worker, cmd, task_id, req)
     
     return IngestResponse(
         status="queued",
@@ -146,13 +211,16 @@ async def process_generic_ingestion(req: IngestRequest, bg: BackgroundTasks) ->
     )
 
 @router.post("/ingest", response_model=IngestResponse)
-async def ingest(req: IngestRequest, bg: BackgroundTasks):
+async def ingest(req: IngestRequest):
     """Unified ingestion endpoint for videos, Twitter, and Instagram"""
-    logger.info(f"Received ingest request: {req}")
+    logger.info("Received ingest request: %s", req)
     
     # If videos are provided, do temporal video processing in background
     if req.videos:
-        return await process_video_ingestion(req.videos, req.process_segments, req.segment_duration, bg)
+        response = await process_video_ingestion(req.videos, req.process_segments, req.segment_duration)
+    else:
+        # Otherwise, handle Twitter/IG ingestion
+        response = await process_generic_ingestion(req)
     
-    # Otherwise, handle Twitter/IG ingestion
-    return await process_generic_ingestion(req, bg) 
\ No newline at end of file
+    # Built from a validated IngestResponse; returning a Response skips FastAPI's re-validation
+    return ORJSONResponse(content=response.model_dump()) 
\ No newline at end of file
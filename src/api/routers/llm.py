@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
 from src.bootstrap.settings import settings
 from src.rag.vector_store import get_vectorstore
-from src.kg.gremlin_client import GremlinKG
+from src.kg.gremlin_client import GremlinKG, get_kg
 from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
+import asyncio
 import logging
+import orjson
 
 router = APIRouter(prefix="/llm", tags=["llm-query"])
 logger = logging.getLogger("llm")
@@ -22,106 +25,175 @@ class LLMQueryResponse(BaseModel):
     entities: List[str] = []
     kg_facts: Dict[str, List[str]] = {}
 
-@router.post("/query", response_model=LLMQueryResponse)
-async def llm_query(request: LLMQueryRequest):
-    """
-    Ask a natural language question about the video corpus (e.g.,
-    'List all the video splits where B-2 bombers were discussed.')
+SYSTEM_PROMPT = (
+    "You are an expert assistant for video analysis. "
+    "Given a user question, a set of knowledge graph facts, and a set of video splits, "
+    "answer the question as precisely as possible, referencing both the facts and the splits. "
+    "If the question asks for a list, return a list of relevant split numbers and their content. "
+    "If no relevant information is found, say so."
+)
+
+# Parsed once; question and context are filled in per request as variables, so
+# braces in transcripts or facts are never read as template placeholders
+LLM_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", "Question: {question}\n\n{context}")
+])
+
+@lru_cache(maxsize=1)
+def get_llm() -> ChatOpenAI:
+    """Get the shared chat model, so every query reuses its HTTP connection pool.
+
+    Built on first use rather than at import, so the app still starts without an API key.
     """
-    question = request.question
-    k = request.k
-    logger.info(f"Received LLM query: {question}")
+    return ChatOpenAI(
+        model=settings.llm_model_name,
+        openai_api_key=settings.openai_api_key,
+        temperature=0.0,
+    )
+
+async def _extract_question_entities(question: str) -> Tuple[Optional[GremlinKG], List[str]]:
+    """Return the shared KG and the entities it finds in the question, or (None, []) if the KG is unavailable"""
+    try:
+        kg = await asyncio.to_thread(get_kg)
+        return kg, await asyncio.to_thread(kg.extract_entities, question)
+    except Exception as e:
+        logger.warning("KG not available or failed: %s", e)
+        return None, []
 
-    # 1. Retrieve relevant splits from the vector store
+async def _retrieve_context(question: str, k: int) -> Tuple[list, List[str], Dict[str, List[str]]]:
+    """Return the relevant splits, entities and KG facts for a question"""
+    # Retrieve relevant splits from the vector store while the KG extracts
+    # entities from the question; the two are independent until the facts lookup
     vectorstore = get_vectorstore()
     if not vectorstore:
         logger.error("Vector store not available")
         raise HTTPException(status_code=503, detail="Vector store not available")
-    docs = vectorstore.search(question, k=k)
+    docs, (kg, entities) = await asyncio.gather(
+        asyncio.to_thread(vectorstore.search, question, k=k),
+        _extract_question_entities(question)
+    )
     if not docs:
         logger.warning("No relevant splits found in vector store")
-        return LLMQueryResponse(answer="No relevant video splits found.", relevant_splits=[])
+        return [], [], {}
 
-    # 2. Use KG to extract entities and get facts
-    kg = None
-    entities = []
+    # Add entities from the splits' metadata and get KG facts
     kg_facts = {}
-    try:
-        kg = GremlinKG()
-        # Extract entities from the question
-        entities = kg.extract_entities(question)
-        # If no entities, extract from splits' metadata
-        if not entities:
-            split_entities = []
-            for doc in docs:
-                ents = doc.metadata.get('entities', [])
-                split_entities.extend(ents)
-            # Deduplicate
-            entities = list(set(split_entities))
-        else:
-            # Also add entities from splits for completeness
-            split_entities = []
-            for doc in docs:
-                ents = doc.metadata.get('entities', [])
-                split_entities.extend(ents)
-            entities = list(set(entities + split_entities))
-        # Get KG facts for all entities
-        for entity in entities:
-            facts = kg.get_facts_for_entity(entity)
-            if facts:
-                kg_facts[entity] = facts
-    except Exception as e:
-        logger.warning(f"KG not available or failed: {e}")
+    if kg is not None:
+        try:
+            # dict.fromkeys dedups in order: question entities first, then the splits'
+            entities = list(dict.fromkeys(
+                [*entities, *(entity for doc in docs for entity in doc.metadata.get('entities', []))]
+            ))
+            # Get KG facts for all entities in one round-trip; free-text questions
+            # over untagged splits have nothing to look up
+            if entities:
+                kg_facts = await asyncio.to_thread(kg.get_facts_for_entities, entities)
+        except Exception as e:
+            logger.warning("KG not available or failed: %s", e)
+    return docs, entities, kg_facts
 
-    # 3. Prepare KG facts context
+def _build_context(docs: list, kg_facts: Dict[str, List[str]]) -> str:
+    """Build the LLM context from the KG facts and the video splits"""
+    # Prepare KG facts context
     if kg_facts:
-        facts_text = "\n".join([f"- {fact}" for entity, facts in kg_facts.items() for fact in facts])
+        facts_text = "\n".join(f"- {fact}" for facts in kg_facts.values() for fact in facts)
         kg_context = f"Here are facts from the knowledge graph about the entities in your question:\n{facts_text}\n"
     else:
         kg_context = ""
 
-    # 4. Prepare video splits context
+    # Prepare video splits context
     splits_context = "Here are the most relevant video splits:\n" + \
         "\n\n".join([f"Split {i+1}: {doc.page_content}" for i, doc in enumerate(docs)])
 
-    # 5. Combine for LLM context
-    full_context = kg_context + splits_context
+    # Combine for LLM context
+    return kg_context + splits_context
 
-    # 6. Prompt the LLM
-    system_prompt = (
-        "You are an expert assistant for video analysis. "
-        "Given a user question, a set of knowledge graph facts, and a set of video splits, "
-        "answer the question as precisely as possible, referencing both the facts and the splits. "
-        "If the question asks for a list, return a list of relevant split numbers and their content. "
-        "If no relevant information is found, say so."
-    )
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", f"Question: {question}\n\n{full_context}")
-    ])
+def _relevant_splits(docs: list) -> List[Dict[str, Any]]:
+    return [
+        {"split_number": i+1, "content": doc.page_content, "metadata": doc.metadata}
+        for i, doc in enumerate(docs)
+    ]
+
+@router.post("/query", response_model=LLMQueryResponse)
+async def llm_query(request: LLMQueryRequest):
+    """
+    Ask a natural language question about the video corpus (e.g.,
+    'List all the video splits where B-2 bombers were discussed.')
+    """
+    question = request.question
+    logger.info("Received LLM query: %s", question)
+
+    # 1. Retrieve relevant splits, entities and KG facts
+    docs, entities, kg_facts = await _retrieve_context(question, request.k)
+    if not docs:
+        return LLMQueryResponse(answer="No relevant video splits found.", relevant_splits=[])
 
-    # 7. Call OpenAI LLM via LangChain
+    # 2. Prompt the LLM
+    prompt_input = {"question": question, "context": _build_context(docs, kg_facts)}
+
+    # 3. Call OpenAI LLM via LangChain
     try:
-        llm = ChatOpenAI(
-            model=settings.llm_model_name,
-            openai_api_key=settings.openai_api_key,
-            temperature=0.0,
-        )
-        chain = prompt | llm
-        result = chain.invoke({})
+        chain = LLM_PROMPT | get_llm()
+        result = await chain.ainvoke(prompt_input)
         answer = result.content if hasattr(result, 'content') else str(result)
     except Exception as e:
-        logger.error(f"LLM call failed: {e}")
+        logger.error("LLM call failed: %s", e)
         raise HTTPException(status_code=500, detail=f"LLM call failed: {e}")
 
-    # 8. Return answer, relevant splits, entities, and KG facts
-    relevant_splits = [
-        {"split_number": i+1, "content": doc.page_content, "metadata": doc.metadata}
-        for i, doc in enumerate(docs)
-    ]
+    # 4. Return answer, relevant splits, entities, and KG facts
     return LLMQueryResponse(
         answer=answer,
-        relevant_splits=relevant_splits,
+        relevant_splits=_relevant_splits(docs),
         entities=entities,
         kg_facts=kg_facts
-    ) 
\ No newline at end of file
+    )
+
+def _sse_event(event: str, data: Any) -> str:
+    # JSON-encoded data keeps newlines in tokens from breaking the event framing
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str).decode()}\n\n"
+
+@router.post("/query/stream")
+async def llm_query_stream(request: LLMQueryRequest):
+    """
+    Ask the same question as /llm/query, streaming the answer as Server-Sent Events
+
+    Emits one `context` event with relevant_splits, entities and kg_facts,
+    then a `token` event per chunk of the answer as the model generates it,
+    and finally `done`, or `error` if generation fails part-way.
+    """
+    question = request.question
+    logger.info("Received streaming LLM query: %s", question)
+
+    docs, entities, kg_facts = await _retrieve_context(question, request.k)
+    try:
+        chain = LLM_PROMPT | get_llm() if docs else None
+    except Exception as e:
+        logger.error("LLM call failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"LLM call failed: {e}")
+
+    async def event_stream():
+        yield _sse_event("context", {
+            "relevant_splits": _relevant_splits(docs),
+            "entities": entities,
+            "kg_facts": kg_facts
+        })
+        if chain is None:
+            yield _sse_event("token", "No relevant video splits found.")
+        else:
+            try:
+                prompt_input = {"question": question, "context": _build_context(docs, kg_facts)}
+                async for chunk in chain.astream(prompt_input):
+                    if chunk.content:
+                        yield _sse_event("token", chunk.content)
+            except Exception as e:
+                logger.error("LLM stream failed: %s", e)
+                yield _sse_event("error", f"LLM call failed: {e}")
+                return
+        yield _sse_event("done", {})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
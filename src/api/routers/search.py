@@ -4,34 +4,44 @@ from typing import List, Optional, Tuple, Dict, Any
 from src.rag.temporal_search import get_temporal_search_service, TemporalSearchQuery, TemporalSearchResult
 from src.bootstrap.logger import get_logger
 from src.rag.vector_store import get_vectorstore
+from src.rag.semantic_cache import cached_search, embed_search_query, search_scope
+from src.api.cache import bump_graph_version
+import asyncio
 import time
 
 router = APIRouter(prefix="/search", tags=["search"])
 logger = get_logger("api.search")
 
+# Placeholder suggestion suffixes; only the first max_suggestions are formatted
+SUGGESTION_TOPICS = ("artificial intelligence", "machine learning", "data science", "neural networks", "deep learning")
+
 class GeneralSearchRequest(BaseModel):
     query: str
     max_results: int = 10
     include_temporal: bool = False
 
+async def _search(service, query: str, max_results: int) -> List[TemporalSearchResult]:
+    temporal_query = TemporalSearchQuery.model_construct(query=query, max_results=max_results)
+    embedding = await embed_search_query(temporal_query)
+    return await cached_search(service, temporal_query, embedding, search_scope(temporal_query))
+
 @router.get("/")
-def search(query: str = Query(..., description="Search query"), 
-           k: int = Query(5, description="Number of results")) -> List[dict]:
+async def search(query: str = Query(..., description="Search query"), 
+                 k: int = Query(5, description="Number of results")) -> List[dict]:
     """
     General search endpoint for backward compatibility
     
     This endpoint performs general search across all content types.
     For temporal video search, use the /temporal endpoints.
     """
-    logger.info(f"General search request: {query}")
+    logger.info("General search request: %s", query)
     
-    service = get_temporal_search_service()
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         return []
     
     # Convert to temporal search
-    temporal_query = TemporalSearchQuery(query=query, max_results=k)
-    results = service.search_entities(temporal_query)
+    results = await _search(service, query, k)
     
     # Convert to legacy format
     legacy_results = []
@@ -51,21 +61,20 @@ def search(query: str = Query(..., description="Search query"),
     return legacy_results
 
 @router.post("/general")
-def general_search(request: GeneralSearchRequest) -> List[dict]:
+async def general_search(request: GeneralSearchRequest) -> List[dict]:
     """
     General search endpoint with enhanced options
     
     Performs search across all content types with optional temporal information.
     """
-    logger.info(f"General search request: {request}")
+    logger.info("General search request: %s", request)
     
-    service = get_temporal_search_service()
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         return []
     
     # Convert to temporal search
-    temporal_query = TemporalSearchQuery(query=request.query, max_results=request.max_results)
-    results = service.search_entities(temporal_query)
+    results = await _search(service, request.query, request.max_results)
     
     # Convert to general format
     search_results = []
@@ -93,32 +102,26 @@ def general_search(request: GeneralSearchRequest) -> List[dict]:
     return search_results
 
 @router.get("/suggestions")
-def get_search_suggestions(query: str = Query(..., description="Base query for suggestions"),
-                          max_suggestions: int = Query(10, description="Maximum number of suggestions")):
+async def get_search_suggestions(query: str = Query(..., description="Base query for suggestions"),
+                                 max_suggestions: int = Query(10, description="Maximum number of suggestions")):
     """
     Get search suggestions based on available content
     
     Returns suggested search terms based on entities and topics found in the system.
     """
-    logger.info(f"Search suggestions request for: {query}")
+    logger.info("Search suggestions request for: %s", query)
     
     # This is a placeholder - in a real implementation, you would
     # query the vector store or knowledge graph for suggestions
-    suggestions = [
-        f"{query} artificial intelligence",
-        f"{query} machine learning",
-        f"{query} data science",
-        f"{query} neural networks",
-        f"{query} deep learning"
-    ]
+    suggestions = [f"{query} {topic}" for topic in SUGGESTION_TOPICS[:max_suggestions]]
     
     return {
         "query": query,
-        "suggestions": suggestions[:max_suggestions]
+        "suggestions": suggestions
     }
 
 @router.get("/stats")
-def get_search_stats():
+async def get_search_stats():
     """
     Get search statistics
     
@@ -139,12 +142,12 @@ def get_search_stats():
     return stats
 
 @router.delete("")
-def delete_all_documents() -> Dict[str, Any]:
+async def delete_all_documents() -> Dict[str, Any]:
     """Delete all documents from the vector store."""
-    start_time = time.time()
+    start_time = time.monotonic()
     try:
         logger.info("Deleting all documents from vector store...")
-        vectorstore = get_vectorstore()
+        vectorstore = await asyncio.to_thread(get_vectorstore)
         
         if not vectorstore:
             logger.error("Vector store not available")
@@ -155,15 +158,17 @@ def delete_all_documents() -> Dict[str, Any]:
             }
         
         # Get count before deletion
-        before_count = vectorstore.get_document_count()
+        before_count = await asyncio.to_thread(vectorstore.get_document_count)
         
         # Delete all documents
-        success = vectorstore.delete_all()
+        success = await asyncio.to_thread(vectorstore.delete_all)
+        # Drops cached search results along with cached graph reads
+        bump_graph_version()
         
-        processing_time = time.time() - start_time
+        processing_time = time.monotonic() - start_time
         
         if success:
-            logger.info(f"All documents deleted from vector store in {processing_time:.2f}s")
+            logger.info("All documents deleted from vector store in %.2fs", processing_time)
             return {
                 "status": "success",
                 "message": f"Successfully deleted {before_count} documents from vector store",
@@ -171,7 +176,7 @@ def delete_all_documents() -> Dict[str, Any]:
                 "processing_time": f"{processing_time:.2f}s"
             }
         else:
-            logger.error(f"Failed to delete documents from vector store after {processing_time:.2f}s")
+            logger.error("Failed to delete documents from vector store after %.2fs", processing_time)
             return {
                 "status": "error",
                 "message": "Failed to delete documents from vector store",
@@ -180,8 +185,8 @@ def delete_all_documents() -> Dict[str, Any]:
             }
             
     except Exception as e:
-        processing_time = time.time() - start_time
-        logger.error(f"Delete operation failed after {processing_time:.2f}s: {e}")
+        processing_time = time.monotonic() - start_time
+        logger.error("Delete operation failed after %.2fs: %s", processing_time, e)
         return {
             "status": "error",
             "message": str(e),
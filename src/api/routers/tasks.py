@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import asyncio
+import base64
+import orjson
+from cachetools import LRUCache
 from src.api.task_tracker import get_task_tracker, TaskStatus, TaskInfo
+from src.api.http_cache import revalidate, STATS_CACHE_CONTROL
 from src.bootstrap.logger import get_logger
 
 router = APIRouter(prefix="/tasks", tags=["task-monitoring"])
+ws_router = APIRouter(prefix="/ws/tasks", tags=["task-monitoring"])
 logger = get_logger("api.tasks")
 
+TERMINAL_STATUSES = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED}
+STREAM_KEEPALIVE_SECONDS = 15.0
+LONG_POLL_TIMEOUT_SECONDS = 30.0
+MAX_LONG_POLL_TIMEOUT_SECONDS = 60.0
+
+# Responses for finished tasks, which no longer change; dropped on cleanup
+_finished_responses: LRUCache = LRUCache(maxsize=1024)
+
 # Response Models
 class TaskStatusResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     task_id: str
     command: List[str]
     status: str
@@ -21,6 +38,8 @@ class TaskStatusResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 class TaskStatsResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     total_tasks: int
     running_tasks: int
     pending_tasks: int
@@ -29,14 +48,64 @@ class TaskStatsResponse(BaseModel):
     success_rate: float
 
 class TaskListResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     tasks: List[TaskStatusResponse]
     total_count: int
+    next_cursor: Optional[str] = None
+
+class TaskSnapshotResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    stats: TaskStatsResponse
+    running: TaskListResponse
+    pending: TaskListResponse
+
+class TaskStatusesRequest(BaseModel):
+    task_ids: List[str]
+
+class TaskStatusesResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    statuses: Dict[str, Optional[TaskStatusResponse]]
+    found_count: int
+
+def _task_fields(task: TaskInfo) -> Dict[str, Any]:
+    """The public fields of a tracked task, as TaskStatusResponse exposes them"""
+    return {
+        "task_id": task.task_id,
+        "command": task.command,
+        "status": task.status.value,
+        "created_at": task.created_at,
+        "started_at": task.started_at,
+        "completed_at": task.completed_at,
+        "error_message": task.error_message,
+        "progress": task.progress,
+        "metadata": task.metadata
+    }
+
+def _to_response(task: TaskInfo) -> TaskStatusResponse:
+    """Build the response model for a tracked task, skipping validation of trusted tracker data"""
+    return TaskStatusResponse.model_construct(**_task_fields(task))
+
+def _task_list(tasks: List[TaskInfo]) -> Dict[str, Any]:
+    """Shape tasks like TaskListResponse for an ORJSONResponse
+
+    Read-only listings skip building a response model per task; orjson encodes
+    the whitelisted fields and their datetimes directly, so fields added to
+    TaskInfo are not exposed until TaskStatusResponse declares them.
+    """
+    return {"tasks": [_task_fields(task) for task in tasks], "total_count": len(tasks), "next_cursor": None}
 
 @router.get("/stats", response_model=TaskStatsResponse)
-async def get_task_stats():
+async def get_task_stats(request: Request, response: Response):
     """
     Get overall task statistics
     
+    Responses carry an ETag and may be reused for two seconds; send the
+    ETag back as If-None-Match to get a 304 Not Modified while the
+    statistics are unchanged.
+    
     Returns:
     - total_tasks: Total number of tasks tracked
     - running_tasks: Number of currently running tasks
@@ -45,188 +114,292 @@ async def get_task_stats():
     - failed_tasks: Number of failed tasks
     - success_rate: Percentage of successful tasks
     """
-    logger.info("Task stats request received")
+    logger.debug("Task stats request received")
     
     try:
         tracker = get_task_tracker()
         stats = await tracker.get_task_stats()
         
-        logger.info(f"Task stats: {stats}")
-        return TaskStatsResponse(**stats)
+        logger.debug("Task stats: %s", stats)
+        stats_response = TaskStatsResponse(**stats)
+        
+        # Let clients revalidate unchanged stats with If-None-Match instead of refetching
+        not_modified = revalidate(request, response, stats_response.model_dump(), STATS_CACHE_CONTROL)
+        return not_modified or stats_response
         
     except Exception as e:
-        logger.error(f"Failed to get task stats: {e}")
+        logger.error("Failed to get task stats: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get task stats: {str(e)}")
 
-@router.get("/running", response_model=TaskListResponse)
+@router.get("/running", response_class=ORJSONResponse, responses={200: {"model": TaskListResponse}})
 async def get_running_tasks():
     """
     Get all currently running background tasks
     
     Returns a list of tasks that are currently being executed.
     """
-    logger.info("Running tasks request received")
+    logger.debug("Running tasks request received")
     
     try:
         tracker = get_task_tracker()
-        tasks = await tracker.get_running_tasks()
-        
-        task_responses = [
-            TaskStatusResponse(
-                task_id=task.task_id,
-                command=task.command,
-                status=task.status.value,
-                created_at=task.created_at,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
-                error_message=task.error_message,
-                progress=task.progress,
-                metadata=task.metadata
-            )
-            for task in tasks
-        ]
-        
-        logger.info(f"Found {len(tasks)} running tasks")
-        return TaskListResponse(tasks=task_responses, total_count=len(tasks))
+        tasks = await tracker.get_tasks_bulk({TaskStatus.RUNNING})
+        
+        logger.debug("Found %s running tasks", len(tasks))
+        return ORJSONResponse(_task_list(tasks))
         
     except Exception as e:
-        logger.error(f"Failed to get running tasks: {e}")
+        logger.error("Failed to get running tasks: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get running tasks: {str(e)}")
 
-@router.get("/pending", response_model=TaskListResponse)
+@router.get("/pending", response_class=ORJSONResponse, responses={200: {"model": TaskListResponse}})
 async def get_pending_tasks():
     """
     Get all pending background tasks
     
     Returns a list of tasks that are queued but not yet started.
     """
-    logger.info("Pending tasks request received")
+    logger.debug("Pending tasks request received")
     
     try:
         tracker = get_task_tracker()
-        tasks = await tracker.get_pending_tasks()
-        
-        task_responses = [
-            TaskStatusResponse(
-                task_id=task.task_id,
-                command=task.command,
-                status=task.status.value,
-                created_at=task.created_at,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
-                error_message=task.error_message,
-                progress=task.progress,
-                metadata=task.metadata
-            )
-            for task in tasks
-        ]
-        
-        logger.info(f"Found {len(tasks)} pending tasks")
-        return TaskListResponse(tasks=task_responses, total_count=len(tasks))
+        tasks = await tracker.get_tasks_bulk({TaskStatus.PENDING})
+        
+        logger.debug("Found %s pending tasks", len(tasks))
+        return ORJSONResponse(_task_list(tasks))
         
     except Exception as e:
-        logger.error(f"Failed to get pending tasks: {e}")
+        logger.error("Failed to get pending tasks: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get pending tasks: {str(e)}")
 
-@router.get("/all", response_model=TaskListResponse)
-async def get_all_tasks(include_completed: bool = True, limit: Optional[int] = 50):
+@router.get("/snapshot", response_class=ORJSONResponse, responses={200: {"model": TaskSnapshotResponse}})
+async def get_task_snapshot():
+    """
+    Get task statistics, running tasks and pending tasks in one request
+    
+    Combines /tasks/stats, /tasks/running and /tasks/pending, read together
+    so the three views are consistent with each other.
+    """
+    logger.debug("Task snapshot request received")
+    
+    try:
+        tracker = get_task_tracker()
+        snapshot = await tracker.get_snapshot()
+        
+        logger.debug("Task snapshot: %s", snapshot['stats'])
+        return ORJSONResponse({
+            "stats": TaskStatsResponse(**snapshot["stats"]).model_dump(),
+            "running": _task_list(snapshot["running"]),
+            "pending": _task_list(snapshot["pending"])
+        })
+        
+    except Exception as e:
+        logger.error("Failed to get task snapshot: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to get task snapshot: {str(e)}")
+
+def _encode_cursor(task: TaskInfo) -> str:
+    return base64.urlsafe_b64encode(f"{task.created_at.isoformat()}|{task.task_id}".encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), task_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+@router.get("/all", response_class=StreamingResponse, responses={200: {"model": TaskListResponse}})
+async def get_all_tasks(include_completed: bool = True, limit: Optional[int] = 50, before: Optional[str] = None):
     """
     Get all background tasks
     
     Args:
     - include_completed: Whether to include completed and failed tasks
     - limit: Maximum number of tasks to return (default: 50)
+    - before: Cursor from a previous page's next_cursor; returns the tasks after that page
     
     Returns a list of all tracked tasks, sorted by creation time (newest first).
+    When more tasks may follow, next_cursor is set to fetch the next page.
+    The body is streamed one task at a time so large listings are never
+    serialized as a single document.
     """
-    logger.info(f"All tasks request received: include_completed={include_completed}, limit={limit}")
+    logger.debug("All tasks request received: include_completed=%s, limit=%s, before=%s", include_completed, limit, before)
     
+    cursor = _decode_cursor(before) if before else None
     try:
         tracker = get_task_tracker()
-        tasks = await tracker.get_all_tasks(include_completed=include_completed, limit=limit)
-        
-        task_responses = [
-            TaskStatusResponse(
-                task_id=task.task_id,
-                command=task.command,
-                status=task.status.value,
-                created_at=task.created_at,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
-                error_message=task.error_message,
-                progress=task.progress,
-                metadata=task.metadata
-            )
-            for task in tasks
-        ]
-        
-        logger.info(f"Found {len(tasks)} tasks")
-        return TaskListResponse(tasks=task_responses, total_count=len(tasks))
+        tasks = await tracker.get_all_tasks(include_completed=include_completed, limit=limit, before=cursor)
+        next_cursor = _encode_cursor(tasks[-1]) if limit and len(tasks) == limit else None
+        
+        logger.debug("Found %s tasks", len(tasks))
         
     except Exception as e:
-        logger.error(f"Failed to get all tasks: {e}")
+        logger.error("Failed to get all tasks: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get all tasks: {str(e)}")
+    
+    def iter_tasks():
+        yield b'{"tasks": ['
+        for i, task in enumerate(tasks):
+            task_json = orjson.dumps(_task_fields(task), default=str)
+            yield task_json if i == 0 else b"," + task_json
+        yield b'], "total_count": %d, "next_cursor": %s}' % (len(tasks), orjson.dumps(next_cursor))
+    
+    return StreamingResponse(iter_tasks(), media_type="application/json")
+
+@router.post("/statuses", response_model=TaskStatusesResponse)
+async def get_task_statuses(request: TaskStatusesRequest):
+    """
+    Get status of several background tasks in one request
+    
+    Args:
+    - task_ids: The unique identifiers of the tasks
+    
+    Returns a mapping of task ID to task information; unknown task IDs map to null.
+    """
+    logger.debug("Task statuses request received for %s tasks", len(request.task_ids))
+    
+    try:
+        tracker = get_task_tracker()
+        tasks = await tracker.get_tasks(request.task_ids)
+        
+        statuses = {
+            task_id: _to_response(task) if task else None
+            for task_id, task in tasks.items()
+        }
+        found_count = sum(1 for status in statuses.values() if status)
+        
+        logger.debug("Found %s/%s tasks", found_count, len(statuses))
+        return TaskStatusesResponse(statuses=statuses, found_count=found_count)
+        
+    except Exception as e:
+        logger.error("Failed to get task statuses: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to get task statuses: {str(e)}")
 
 @router.get("/{task_id}", response_model=TaskStatusResponse)
-async def get_task_status(task_id: str):
+async def get_task_status(task_id: str, wait_for_change: bool = False, timeout: float = LONG_POLL_TIMEOUT_SECONDS):
     """
     Get status of a specific background task
     
     Args:
     - task_id: The unique identifier of the task
+    - wait_for_change: Hold the request open until the task changes (long-polling)
+    - timeout: Maximum seconds to hold a long-poll request (default: 30, max: 60)
     
-    Returns detailed information about the specified task.
+    Returns detailed information about the specified task. With wait_for_change,
+    the response is sent as soon as the task changes, or with the unchanged state
+    once the timeout expires. Finished tasks are returned immediately.
     """
-    logger.info(f"Task status request received for task: {task_id}")
+    logger.debug("Task status request received for task: %s", task_id)
+    
+    cached = _finished_responses.get(task_id)
+    if cached is not None:
+        return cached
     
     try:
         tracker = get_task_tracker()
-        task = await tracker.get_task(task_id)
-        
-        if not task:
-            logger.warning(f"Task not found: {task_id}")
-            raise HTTPException(status_code=404, detail=f"Task not found: {task_id}")
-        
-        task_response = TaskStatusResponse(
-            task_id=task.task_id,
-            command=task.command,
-            status=task.status.value,
-            created_at=task.created_at,
-            started_at=task.started_at,
-            completed_at=task.completed_at,
-            error_message=task.error_message,
-            progress=task.progress,
-            metadata=task.metadata
-        )
-        
-        logger.info(f"Task {task_id} status: {task.status.value}")
+        changed = tracker.subscribe(task_id) if wait_for_change else None
+        try:
+            task = await tracker.get_task(task_id)
+            
+            if not task:
+                logger.warning("Task not found: %s", task_id)
+                raise HTTPException(status_code=404, detail=f"Task not found: {task_id}")
+            
+            if changed and task.status not in TERMINAL_STATUSES:
+                timeout = min(max(timeout, 0.0), MAX_LONG_POLL_TIMEOUT_SECONDS)
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=timeout)
+                    task = await tracker.get_task(task_id) or task
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if changed:
+                tracker.unsubscribe(task_id, changed)
+        
+        task_response = _to_response(task)
+        if task.status in TERMINAL_STATUSES:
+            _finished_responses[task_id] = task_response
+        
+        logger.debug("Task %s status: %s", task_id, task.status.value)
         return task_response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get task status for {task_id}: {e}")
+        logger.error("Failed to get task status for %s: %s", task_id, e)
         raise HTTPException(status_code=500, detail=f"Failed to get task status: {str(e)}")
 
+@router.get("/{task_id}/stream")
+async def stream_task_status(task_id: str):
+    """
+    Stream status changes of a specific background task as Server-Sent Events
+    
+    Args:
+    - task_id: The unique identifier of the task
+    
+    Emits one `data:` event with the current task state on connect and another
+    each time the task changes. The stream closes once the task reaches a
+    terminal status.
+    """
+    logger.debug("Task stream request received for task: %s", task_id)
+    
+    tracker = get_task_tracker()
+    if not await tracker.get_task(task_id):
+        logger.warning("Task not found: %s", task_id)
+        raise HTTPException(status_code=404, detail=f"Task not found: {task_id}")
+    
+    async def event_stream():
+        last_payload = None
+        while True:
+            # Subscribe before reading so a change between the read and the wait is not lost
+            changed = tracker.subscribe(task_id)
+            try:
+                task = await tracker.get_task(task_id)
+                if not task:
+                    return
+                
+                payload = _to_response(task).model_dump_json()
+                
+                if payload != last_payload:
+                    last_payload = payload
+                    yield f"data: {payload}\n\n"
+                
+                if task.status in TERMINAL_STATUSES:
+                    logger.info("Task %s stream closed: %s", task_id, task.status.value)
+                    return
+                
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+            finally:
+                tracker.unsubscribe(task_id, changed)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
 @router.get("/count/running")
-async def get_running_task_count():
+async def get_running_task_count(request: Request, response: Response):
     """
     Get the count of currently running background tasks
     
     Returns a simple count of tasks that are currently being executed.
+    Revalidates with ETag / If-None-Match like /tasks/stats.
     """
-    logger.info("Running task count request received")
+    logger.debug("Running task count request received")
     
     try:
         tracker = get_task_tracker()
-        running_tasks = await tracker.get_running_tasks()
-        count = len(running_tasks)
+        count = await tracker.count_running()
         
-        logger.info(f"Running task count: {count}")
-        return {"running_tasks": count}
+        logger.debug("Running task count: %s", count)
+        payload = {"running_tasks": count}
+        return revalidate(request, response, payload, STATS_CACHE_CONTROL) or payload
         
     except Exception as e:
-        logger.error(f"Failed to get running task count: {e}")
+        logger.error("Failed to get running task count: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get running task count: {str(e)}")
 
 @router.delete("/cleanup")
@@ -239,15 +412,64 @@ async def cleanup_old_tasks(days: int = 7):
     
     Returns the number of tasks that were cleaned up.
     """
-    logger.info(f"Task cleanup request received: days={days}")
+    logger.debug("Task cleanup request received: days=%s", days)
     
     try:
         tracker = get_task_tracker()
         cleaned_count = await tracker.cleanup_old_tasks(days=days)
+        if cleaned_count:
+            _finished_responses.clear()
         
-        logger.info(f"Cleaned up {cleaned_count} old tasks")
+        logger.info("Cleaned up %s old tasks", cleaned_count)
         return {"cleaned_tasks": cleaned_count, "days": days}
         
     except Exception as e:
-        logger.error(f"Failed to cleanup old tasks: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to cleanup old tasks: {str(e)}") 
\ No newline at end of file
+        logger.error("Failed to cleanup old tasks: %s", e)
+        raise HTTPException(status_code=500, detail=f"Failed to cleanup old tasks: {str(e)}") 
+
+@ws_router.websocket("/{task_id}")
+async def task_status_websocket(websocket: WebSocket, task_id: str):
+    """
+    Push status changes of a specific background task over a WebSocket
+    
+    The first message carries the full task state; every following message
+    only carries `task_id` plus the fields that changed since the previous one.
+    The socket is closed once the task reaches a terminal status.
+    """
+    logger.info("Task websocket opened for task: %s", task_id)
+    await websocket.accept()
+    
+    tracker = get_task_tracker()
+    last_state: Dict[str, Any] = {}
+    try:
+        while True:
+            # Subscribe before reading so a change between the read and the wait is not lost
+            changed = tracker.subscribe(task_id)
+            try:
+                task = await tracker.get_task(task_id)
+                if not task:
+                    logger.warning("Task not found: %s", task_id)
+                    await websocket.close(code=4404, reason=f"Task not found: {task_id}")
+                    return
+                
+                state = _to_response(task).model_dump(mode="json")
+                
+                delta = {k: v for k, v in state.items() if k not in last_state or last_state[k] != v}
+                if delta:
+                    delta["task_id"] = task_id
+                    await websocket.send_json(delta)
+                    last_state = state
+                
+                if task.status in TERMINAL_STATUSES:
+                    logger.info("Task %s websocket closed: %s", task_id, task.status.value)
+                    await websocket.close()
+                    return
+                
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                tracker.unsubscribe(task_id, changed)
+    except WebSocketDisconnect:
+        logger.info("Task websocket disconnected for task: %s", task_id)
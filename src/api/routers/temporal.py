@@ -1,16 +1,33 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Tuple
 from src.rag.temporal_search import get_temporal_search_service, TemporalSearchQuery, TemporalSearchResult
-from src.ingest.youtube import YouTubeVideoSource
+from src.rag.semantic_cache import cached_search, embed_search_query, search_scope
+from src.api.routers.search import SUGGESTION_TOPICS
+from src.ingest.youtube import get_video_source
+from src.ingest.base import VideoContentItem
 from src.bootstrap.logger import get_logger
 from src.api.task_tracker import get_task_tracker
+from src.api.cache import graph_version
+from src.api.http_cache import revalidate, STATS_CACHE_CONTROL
+from cachetools import TTLCache
+import asyncio
 import json
 import time
 
 router = APIRouter(prefix="/temporal", tags=["temporal-search"])
 logger = get_logger("api.temporal")
 
+# Per-video responses, only touched from the event loop so no lock is needed.
+# Timelines are keyed by (graph version, video_id) and rebuilt after an ingest;
+# video info comes from YouTube, not the graph, so it is keyed by video_id alone.
+VIDEO_CACHE_SIZE = 1024
+VIDEO_CACHE_TTL_SECONDS = 3600
+VIDEO_INFO_CACHE_SIZE = 2000
+VIDEO_INFO_CACHE_CONTROL = f"public, max-age={VIDEO_CACHE_TTL_SECONDS}"
+_timeline_cache: TTLCache = TTLCache(maxsize=VIDEO_CACHE_SIZE, ttl=VIDEO_CACHE_TTL_SECONDS)
+_video_info_cache: TTLCache = TTLCache(maxsize=VIDEO_INFO_CACHE_SIZE, ttl=VIDEO_CACHE_TTL_SECONDS)
+
 # Request Models
 class VideoIngestRequest(BaseModel):
     video_ids: List[str]
@@ -40,6 +57,8 @@ class VideoInfoRequest(BaseModel):
 
 # Response Models
 class VideoIngestResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     status: str
     message: str
     video_id: str
@@ -48,6 +67,8 @@ class VideoIngestResponse(BaseModel):
     duration: float
 
 class VideoInfoResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     video_id: str
     title: str
     description: str
@@ -59,6 +80,8 @@ class VideoInfoResponse(BaseModel):
     total_entities: List[str]
 
 class SearchResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     query: str
     results_count: int
     results: List[TemporalSearchResult]
@@ -74,7 +97,7 @@ async def temporal_search(request: TemporalSearchRequest):
     - Time range filtering
     - Video-specific filtering
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f"Temporal search request received: '{request.query}'")
     logger.info(f"Search parameters: max_results={request.max_results}, video_ids={request.video_ids}")
     
@@ -85,36 +108,31 @@ async def temporal_search(request: TemporalSearchRequest):
     if request.time_range:
         logger.info(f"Time range: {request.time_range[0]:.1f}s - {request.time_range[1]:.1f}s")
     
-    service = get_temporal_search_service()
+    # The request was validated on the way in and has the same fields, so skip a second validation
+    query = TemporalSearchQuery.model_construct(**dict(request))
+    
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         logger.error("Temporal search service not available")
         raise HTTPException(status_code=503, detail="Temporal search service not available")
     
+    # Near-identical rephrasings with the same filters share results until the next ingest
+    embedding = await embed_search_query(query)
     try:
-        query = TemporalSearchQuery(
-            query=request.query,
-            video_ids=request.video_ids,
-            entity_filter=request.entity_filter,
-            topic_filter=request.topic_filter,
-            time_range=request.time_range,
-            max_results=request.max_results
-        )
-        
-        results = service.search_entities(query)
-        
-        search_time = time.time() - start_time
-        logger.info(f"Temporal search completed in {search_time:.2f}s")
-        logger.info(f"Returning {len(results)} results")
-        
-        return SearchResponse(
-            query=request.query,
-            results_count=len(results),
-            results=results
-        )
-        
+        results = await cached_search(service, query, embedding, search_scope(query))
     except Exception as e:
         logger.error(f"Temporal search failed: {e}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    
+    search_time = time.monotonic() - start_time
+    logger.info(f"Temporal search completed in {search_time:.2f}s")
+    logger.info(f"Returning {len(results)} results")
+    
+    return SearchResponse(
+        query=request.query,
+        results_count=len(results),
+        results=results
+    )
 
 @router.post("/search-entity", response_model=SearchResponse)
 async def search_entity(request: EntitySearchRequest):
@@ -124,19 +142,19 @@ async def search_entity(request: EntitySearchRequest):
     Find all occurrences of a specific entity (person, organization, location, etc.)
     with precise timestamps indicating when they appear or are discussed.
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f"Entity search request received: '{request.entity}'")
     logger.info(f"Search parameters: max_results={request.max_results}, video_ids={request.video_ids}")
     
-    service = get_temporal_search_service()
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         logger.error("Temporal search service not available")
         raise HTTPException(status_code=503, detail="Temporal search service not available")
     
     try:
-        results = service.search_by_entity(request.entity, request.video_ids)
+        results = await asyncio.to_thread(service.search_by_entity, request.entity, request.video_ids)
         
-        search_time = time.time() - start_time
+        search_time = time.monotonic() - start_time
         logger.info(f"Entity search completed in {search_time:.2f}s")
         logger.info(f"Found {len(results)} mentions of '{request.entity}'")
         
@@ -157,19 +175,19 @@ async def search_topic(request: TopicSearchRequest):
     
     Find all segments where specific topics are discussed with precise timestamps.
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f"Topic search request received: '{request.topic}'")
     logger.info(f"Search parameters: max_results={request.max_results}, video_ids={request.video_ids}")
     
-    service = get_temporal_search_service()
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         logger.error("Temporal search service not available")
         raise HTTPException(status_code=503, detail="Temporal search service not available")
     
     try:
-        results = service.search_by_topic(request.topic, request.video_ids)
+        results = await asyncio.to_thread(service.search_by_topic, request.topic, request.video_ids)
         
-        search_time = time.time() - start_time
+        search_time = time.monotonic() - start_time
         logger.info(f"Topic search completed in {search_time:.2f}s")
         logger.info(f"Found {len(results)} discussions of '{request.topic}'")
         
@@ -191,25 +209,32 @@ async def get_video_timeline(video_id: str):
     Returns all temporal segments of a video with their associated entities,
     topics, and timestamps for comprehensive video analysis.
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f"Video timeline request received for: {video_id}")
     
-    service = get_temporal_search_service()
+    cache_key = (graph_version(), video_id)
+    timeline = _timeline_cache.get(cache_key)
+    if timeline is not None:
+        logger.debug(f"Video timeline cache hit for: {video_id}")
+        return timeline
+    
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         logger.error("Temporal search service not available")
         raise HTTPException(status_code=503, detail="Temporal search service not available")
     
     try:
-        timeline = service.get_video_timeline(video_id)
+        timeline = await asyncio.to_thread(service.get_video_timeline, video_id)
         
         if not timeline:
             logger.warning(f"Video timeline not found: {video_id}")
             raise HTTPException(status_code=404, detail="Video timeline not found")
         
-        timeline_time = time.time() - start_time
+        timeline_time = time.monotonic() - start_time
         logger.info(f"Video timeline retrieved in {timeline_time:.2f}s")
         logger.info(f"Returning {len(timeline)} segments for video {video_id}")
         
+        _timeline_cache[cache_key] = timeline
         return timeline
         
     except HTTPException:
@@ -218,42 +243,46 @@ async def get_video_timeline(video_id: str):
         logger.error(f"Video timeline retrieval failed: {e}")
         raise HTTPException(status_code=500, detail=f"Timeline retrieval failed: {str(e)}")
 
+def _fetch_video_item(video_id: str) -> Optional[VideoContentItem]:
+    """Fetch one video with the shared video source, or None if it could not be processed"""
+    return next(iter(get_video_source().fetch_video([video_id])), None)
+
 @router.get("/video-info/{video_id}", response_model=VideoInfoResponse)
-async def get_video_info(video_id: str):
+async def get_video_info(video_id: str, request: Request, response: Response):
     """
     Get comprehensive information about a video
     
     Returns video metadata including title, description, duration,
     segment count, and all entities found across segments.
+    Responses carry an ETag and may be reused for an hour; send the ETag
+    back as If-None-Match to get a 304 Not Modified while it is unchanged.
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     logger.info(f"Video info request received for: {video_id}")
     
+    video_info = _video_info_cache.get(video_id)
+    if video_info is not None:
+        logger.debug(f"Video info cache hit for: {video_id}")
+        return revalidate(request, response, video_info.model_dump(), VIDEO_INFO_CACHE_CONTROL) or video_info
+    
     try:
-        video_source = YouTubeVideoSource()
-        
-        # Fetch video info
+        # Fetch video info; the download and transcription run off the event loop
         logger.info(f"Fetching video info for: {video_id}")
-        video_item = None
-        for item in video_source.fetch_video([video_id]):
-            video_item = item
-            break
+        video_item = await asyncio.to_thread(_fetch_video_item, video_id)
         
         if not video_item:
             logger.error(f"Video not found: {video_id}")
             raise HTTPException(status_code=404, detail="Video not found")
         
-        # Collect all entities from segments
-        all_entities = []
-        for segment in video_item.segments:
-            all_entities.extend(segment.entities)
-        all_entities = list(set(all_entities))  # Remove duplicates
+        # Collect the unique entities across all segments, sorted so every worker
+        # returns the same body (and ETag) for a video
+        all_entities = sorted({entity for segment in video_item.segments for entity in segment.entities})
         
-        info_time = time.time() - start_time
+        info_time = time.monotonic() - start_time
         logger.info(f"Video info retrieved in {info_time:.2f}s")
         logger.info(f"Video: {video_item.title}, {len(video_item.segments)} segments, {len(all_entities)} entities")
         
-        return VideoInfoResponse(
+        video_info = VideoInfoResponse(
             video_id=video_item.id,
             title=video_item.title,
             description=video_item.description,
@@ -264,6 +293,8 @@ async def get_video_info(video_id: str):
             segment_count=len(video_item.segments),
             total_entities=all_entities
         )
+        _video_info_cache[video_id] = video_info
+        return revalidate(request, response, video_info.model_dump(), VIDEO_INFO_CACHE_CONTROL) or video_info
         
     except HTTPException:
         raise
@@ -282,7 +313,7 @@ async def get_search_suggestions(query: str, max_suggestions: int = 10):
     logger.info(f"Search suggestions request received for: '{query}'")
     logger.info(f"Parameters: max_suggestions={max_suggestions}")
     
-    service = get_temporal_search_service()
+    service = await asyncio.to_thread(get_temporal_search_service)
     if not service:
         logger.error("Temporal search service not available")
         raise HTTPException(status_code=503, detail="Temporal search service not available")
@@ -290,19 +321,13 @@ async def get_search_suggestions(query: str, max_suggestions: int = 10):
     try:
         # This is a placeholder - in a real implementation, you would
         # query the vector store or knowledge graph for suggestions
-        suggestions = [
-            f"{query} artificial intelligence",
-            f"{query} machine learning",
-            f"{query} data science",
-            f"{query} neural networks",
-            f"{query} deep learning"
-        ]
+        suggestions = [f"{query} {topic}" for topic in SUGGESTION_TOPICS[:max_suggestions]]
         
-        logger.info(f"Returning {len(suggestions[:max_suggestions])} suggestions")
+        logger.info(f"Returning {len(suggestions)} suggestions")
         
         return {
             "query": query,
-            "suggestions": suggestions[:max_suggestions]
+            "suggestions": suggestions
         }
         
     except Exception as e:
@@ -310,11 +335,12 @@ async def get_search_suggestions(query: str, max_suggestions: int = 10):
         raise HTTPException(status_code=500, detail=f"Search suggestions failed: {str(e)}")
 
 @router.get("/stats")
-async def get_temporal_search_stats():
+async def get_temporal_search_stats(request: Request, response: Response):
     """
     Get statistics about the temporal search system
     
     Returns metrics about processed videos, segments, entities, and search performance.
+    Revalidates with ETag / If-None-Match like /tasks/stats.
     """
     logger.info("Temporal search stats request received")
     
@@ -335,7 +361,7 @@ async def get_temporal_search_stats():
         
         logger.info("Returning temporal search statistics")
         
-        return stats
+        return revalidate(request, response, stats, STATS_CACHE_CONTROL) or stats
         
     except Exception as e:
         logger.error(f"Stats retrieval failed: {e}")
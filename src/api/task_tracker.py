@@ -1,8 +1,10 @@
 import asyncio
+import bisect
+import threading
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
 from src.bootstrap.logger import get_logger
@@ -16,6 +18,9 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+# Finished tasks that cleanup_old_tasks may remove
+CLEANUP_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED})
+
 @dataclass
 class TaskInfo:
     task_id: str
@@ -33,11 +38,47 @@ class TaskTracker:
     
     def __init__(self):
         self._tasks: Dict[str, TaskInfo] = {}
-        self._lock = asyncio.Lock()
+        # (created_at, task_id) of every task in ascending order, for keyset pagination
+        self._order: List[Tuple[datetime, str]] = []
+        # Held only for short sections that never await, so a plain lock serializes
+        # writers across threads and event loops without suspending anyone; single
+        # dict lookups are atomic and read without it
+        self._lock = threading.Lock()
+        # IDs of the tasks in each status, kept up to date on every transition, so
+        # status listings and counts never scan finished tasks
+        self._by_status: Dict[TaskStatus, Set[str]] = {status: set() for status in TaskStatus}
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+    
+    def subscribe(self, task_id: str) -> asyncio.Event:
+        """Return an event that is set on the next state change of a task"""
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._subscribers.setdefault(task_id, []).append((loop, event))
+        return event
+    
+    def unsubscribe(self, task_id: str, event: asyncio.Event) -> None:
+        """Stop waiting for state changes of a task"""
+        waiters = self._subscribers.get(task_id)
+        if not waiters:
+            return
+        waiters[:] = [(loop, e) for loop, e in waiters if e is not event]
+        if not waiters:
+            del self._subscribers[task_id]
+    
+    def _set_status(self, task: TaskInfo, status: TaskStatus) -> None:
+        """Move a task to a new status, keeping the status index in step; the caller must hold the lock"""
+        self._by_status[task.status].discard(task.task_id)
+        self._by_status[status].add(task.task_id)
+        task.status = status
+    
+    def _notify(self, task_id: str) -> None:
+        """Wake up everyone waiting on a task. Safe to call from any thread or event loop."""
+        for loop, event in self._subscribers.pop(task_id, []):
+            loop.call_soon_threadsafe(event.set)
     
     async def add_task(self, command: List[str], metadata: Optional[Dict[str, Any]] = None) -> str:
         """Add a new task to tracking"""
-        async with self._lock:
+        with self._lock:
             task_id = str(uuid.uuid4())
             task_info = TaskInfo(
                 task_id=task_id,
@@ -47,113 +88,170 @@ class TaskTracker:
                 metadata=metadata or {}
             )
             self._tasks[task_id] = task_info
-            logger.info(f"Added task {task_id} to tracking: {command}")
+            self._by_status[TaskStatus.PENDING].add(task_id)
+            # Appends in practice; insort keeps the order if the clock steps back
+            bisect.insort(self._order, (task_info.created_at, task_id))
+            logger.info("Added task %s to tracking: %s", task_id, command)
             return task_id
     
     async def start_task(self, task_id: str) -> bool:
         """Mark a task as started"""
-        async with self._lock:
+        with self._lock:
             if task_id not in self._tasks:
                 return False
             
             task = self._tasks[task_id]
-            task.status = TaskStatus.RUNNING
+            self._set_status(task, TaskStatus.RUNNING)
             task.started_at = datetime.now()
-            logger.info(f"Task {task_id} started")
+            logger.info("Task %s started", task_id)
+            self._notify(task_id)
             return True
     
-    async def complete_task(self, task_id: str, success: bool = True, error_message: Optional[str] = None) -> bool:
-        """Mark a task as completed or failed"""
-        async with self._lock:
+    async def complete_task(self, task_id: str, success: bool = True, error_message: Optional[str] = None,
+                            progress: Optional[str] = None) -> bool:
+        """Mark a task as completed or failed, optionally recording a final progress message"""
+        with self._lock:
             if task_id not in self._tasks:
                 return False
             
             task = self._tasks[task_id]
             task.completed_at = datetime.now()
+            if progress is not None:
+                task.progress = progress
             
             if success:
-                task.status = TaskStatus.COMPLETED
-                logger.info(f"Task {task_id} completed successfully")
+                self._set_status(task, TaskStatus.COMPLETED)
+                logger.info("Task %s completed successfully", task_id)
             else:
-                task.status = TaskStatus.FAILED
+                self._set_status(task, TaskStatus.FAILED)
                 task.error_message = error_message
-                logger.error(f"Task {task_id} failed: {error_message}")
+                logger.error("Task %s failed: %s", task_id, error_message)
             
+            self._notify(task_id)
             return True
     
     async def update_progress(self, task_id: str, progress: str) -> bool:
         """Update task progress"""
-        async with self._lock:
+        with self._lock:
             if task_id not in self._tasks:
                 return False
             
             task = self._tasks[task_id]
             task.progress = progress
+            self._notify(task_id)
+            return True
+    
+    async def update_progress_batch(self, task_id: str, messages: List[str]) -> bool:
+        """Apply several progress updates with one lock acquisition and one notification
+
+        Only the latest message is kept as the task's progress, exactly as if
+        update_progress had been called for each message in turn.
+        """
+        if not messages:
+            return task_id in self._tasks
+        with self._lock:
+            if task_id not in self._tasks:
+                return False
+            
+            self._tasks[task_id].progress = messages[-1]
+            self._notify(task_id)
             return True
     
     async def get_task(self, task_id: str) -> Optional[TaskInfo]:
         """Get task information by ID"""
-        async with self._lock:
-            return self._tasks.get(task_id)
+        return self._tasks.get(task_id)
+    
+    async def get_tasks(self, task_ids: List[str]) -> Dict[str, Optional[TaskInfo]]:
+        """Get information for several tasks at once, None for unknown IDs"""
+        return {task_id: self._tasks.get(task_id) for task_id in task_ids}
     
-    async def get_all_tasks(self, include_completed: bool = True, limit: Optional[int] = None) -> List[TaskInfo]:
+    async def get_tasks_bulk(self, statuses: Optional[Set[TaskStatus]] = None, limit: Optional[int] = None,
+                             before: Optional[Tuple[datetime, str]] = None) -> List[TaskInfo]:
+        """Get tasks in any of the given statuses (all tasks when None), newest first, in one read
+        
+        `before` is a (created_at, task_id) cursor; only tasks older than it are returned.
+        """
+        with self._lock:
+            return self._select(statuses, limit, before)
+    
+    def _select(self, statuses: Optional[Set[TaskStatus]], limit: Optional[int],
+                before: Optional[Tuple[datetime, str]]) -> List[TaskInfo]:
+        """Tasks in the given statuses, newest first; the caller must hold the lock"""
+        if statuses is not None:
+            # Sort just the tasks in those statuses rather than walking every task
+            tasks = [self._tasks[task_id] for status in statuses for task_id in self._by_status[status]]
+            if before:
+                tasks = [task for task in tasks if (task.created_at, task.task_id) < before]
+            tasks.sort(key=lambda task: (task.created_at, task.task_id), reverse=True)
+            return tasks[:limit] if limit else tasks
+        
+        end = bisect.bisect_left(self._order, before) if before else len(self._order)
+        # Walk back from the cursor, so a page costs O(limit) rather than a full sort
+        start = max(end - limit, 0) if limit else 0
+        return [self._tasks[self._order[i][1]] for i in range(end - 1, start - 1, -1)]
+    
+    async def get_all_tasks(self, include_completed: bool = True, limit: Optional[int] = None,
+                            before: Optional[Tuple[datetime, str]] = None) -> List[TaskInfo]:
         """Get all tasks, optionally filtering by completion status"""
-        async with self._lock:
-            tasks = list(self._tasks.values())
-            
-            if not include_completed:
-                tasks = [t for t in tasks if t.status not in [TaskStatus.COMPLETED, TaskStatus.FAILED]]
-            
-            # Sort by creation time (newest first)
-            tasks.sort(key=lambda x: x.created_at, reverse=True)
-            
-            if limit:
-                tasks = tasks[:limit]
-            
-            return tasks
+        statuses = None if include_completed else {TaskStatus.PENDING, TaskStatus.RUNNING, TaskStatus.CANCELLED}
+        return await self.get_tasks_bulk(statuses, limit, before)
     
     async def get_running_tasks(self) -> List[TaskInfo]:
         """Get all currently running tasks"""
-        async with self._lock:
-            return [t for t in self._tasks.values() if t.status == TaskStatus.RUNNING]
+        return await self.get_tasks_bulk({TaskStatus.RUNNING})
     
     async def get_pending_tasks(self) -> List[TaskInfo]:
         """Get all pending tasks"""
-        async with self._lock:
-            return [t for t in self._tasks.values() if t.status == TaskStatus.PENDING]
+        return await self.get_tasks_bulk({TaskStatus.PENDING})
+    
+    async def count_running(self) -> int:
+        """Count running tasks without building a list of them"""
+        return len(self._by_status[TaskStatus.RUNNING])
     
     async def cleanup_old_tasks(self, days: int = 7) -> int:
         """Remove old completed/failed tasks"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        async with self._lock:
-            old_tasks = [
-                task_id for task_id, task in self._tasks.items()
-                if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED] and task.completed_at < cutoff_date
-            ]
-            
-            for task_id in old_tasks:
-                del self._tasks[task_id]
+        with self._lock:
+            # Only finished tasks are candidates; the creation order is rebuilt only if any expired
+            expired = {
+                task_id for status in CLEANUP_STATUSES for task_id in self._by_status[status]
+                if self._tasks[task_id].completed_at < cutoff_date
+            }
+            for task_id in expired:
+                self._by_status[self._tasks.pop(task_id).status].discard(task_id)
+            if expired:
+                self._order = [key for key in self._order if key[1] not in expired]
             
-            logger.info(f"Cleaned up {len(old_tasks)} old tasks")
-            return len(old_tasks)
+            logger.info("Cleaned up %s old tasks", len(expired))
+            return len(expired)
     
     async def get_task_stats(self) -> Dict[str, Any]:
         """Get task statistics"""
-        async with self._lock:
-            total_tasks = len(self._tasks)
-            running_tasks = len([t for t in self._tasks.values() if t.status == TaskStatus.RUNNING])
-            pending_tasks = len([t for t in self._tasks.values() if t.status == TaskStatus.PENDING])
-            completed_tasks = len([t for t in self._tasks.values() if t.status == TaskStatus.COMPLETED])
-            failed_tasks = len([t for t in self._tasks.values() if t.status == TaskStatus.FAILED])
-            
+        with self._lock:
+            return self._compute_stats()
+    
+    async def get_snapshot(self) -> Dict[str, Any]:
+        """Get statistics, running and pending tasks from one consistent read"""
+        with self._lock:
             return {
-                "total_tasks": total_tasks,
-                "running_tasks": running_tasks,
-                "pending_tasks": pending_tasks,
-                "completed_tasks": completed_tasks,
-                "failed_tasks": failed_tasks,
-                "success_rate": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+                "stats": self._compute_stats(),
+                "running": self._select({TaskStatus.RUNNING}, None, None),
+                "pending": self._select({TaskStatus.PENDING}, None, None)
             }
+    
+    def _compute_stats(self) -> Dict[str, Any]:
+        """Build task statistics from the status index; the caller must hold the lock"""
+        total_tasks = len(self._tasks)
+        completed_tasks = len(self._by_status[TaskStatus.COMPLETED])
+        
+        return {
+            "total_tasks": total_tasks,
+            "running_tasks": len(self._by_status[TaskStatus.RUNNING]),
+            "pending_tasks": len(self._by_status[TaskStatus.PENDING]),
+            "completed_tasks": completed_tasks,
+            "failed_tasks": len(self._by_status[TaskStatus.FAILED]),
+            "success_rate": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        }
 
 # Global task tracker instance
 task_tracker = TaskTracker()
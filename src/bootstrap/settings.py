@@ -11,10 +11,24 @@ class Settings(BaseSettings):
     aws_region: str = "eu-west-2"
     vectordb_uri: str | None = None
     embedding_model_name: str = "text-embedding-3-small"
+    embedding_dimensions: int = 1536
+    # Search an fp16 (halfvec) HNSW index and rescore candidates in float32; needs pgvector >= 0.7
+    vector_halfvec_search: bool = False
     llm_model_name: str = "gpt-3.5-turbo"
     kg_backend: Literal["neptune", "neo4j", "dgraph"] = "neptune"
     kg_uri: str | None = None
     transcripts_bucket: str = "kg-rag-transcripts"
+    # Videos ingested in parallel by one background ingest task
+    ingest_concurrency: int = 4
+    # Ingest tasks run at once, and how many more may wait for a free worker
+    ingest_workers: int = 2
+    ingest_queue_size: int = 100
+    # URLs accepted per source (videos, twitter, ig) in one ingest request
+    ingest_max_items: int = 100
+    # Concurrent /temporal/search queries are embedded together: up to this many,
+    # collected for at most this long after the first one arrives
+    search_batch_max_size: int = 32
+    search_batch_max_wait_ms: float = 20.0
     openai_api_key: str | None = None
     bedrock_region: str | None = None
     bedrock_model_id: str | None = None
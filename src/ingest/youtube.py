@@ -3,6 +3,7 @@ from youtube_transcript_api import YouTubeTranscriptApi
 import yt_dlp
 from datetime import datetime, timezone
 from typing import Iterable, List, Optional
+from functools import lru_cache
 from src.kg.entity_extraction import SpaCyEntityExtractor
 from src.rag.vector_store import get_vectorstore
 import logging
@@ -211,11 +212,16 @@ class YouTubeVideoSource(IVideoSource):
             embedding=embedding
         )
 
+@lru_cache(maxsize=1)
+def get_video_source() -> YouTubeVideoSource:
+    """Get the shared YouTubeVideoSource, loading its entity extractor and vector store once."""
+    return YouTubeVideoSource()
+
 # Keep the original YouTubeSource for backward compatibility
 class YouTubeSource(ISource):
     def fetch(self, video_ids: List[str], since: datetime | None = None) -> Iterable[ContentItem]:
         logger.info("Using legacy YouTubeSource for backward compatibility")
-        video_source = YouTubeVideoSource()
+        video_source = get_video_source()
         for video_item in video_source.fetch_video(video_ids, since):
             # Convert to legacy ContentItem format
             yield ContentItem(
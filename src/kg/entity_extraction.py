@@ -5,6 +5,9 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# spaCy entity labels kept as graph entities
+ENTITY_LABELS = frozenset({'PERSON', 'ORG', 'GPE', 'PRODUCT'})
+
 class SpaCyEntityExtractor:
     def __init__(self):
         logger.info("Initializing SpaCyEntityExtractor")
@@ -27,8 +30,7 @@ class SpaCyEntityExtractor:
             logger.debug(f"Extracting entities from text ({len(text)} chars)")
             
             doc = self.nlp(text)
-            entities = [ent.text for ent in doc.ents if ent.label_ in ['PERSON', 'ORG', 'GPE', 'PRODUCT']]
-            unique_entities = list(set(entities))
+            unique_entities = list({ent.text for ent in doc.ents if ent.label_ in ENTITY_LABELS})
             
             extraction_time = time.time() - start_time
             logger.debug(f"Entity extraction completed in {extraction_time:.3f}s")
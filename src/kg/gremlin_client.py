@@ -2,7 +2,8 @@ from .schema import Node, Edge
 from .base import BaseKnowledgeGraph
 from .entity_extraction import SpaCyEntityExtractor, FallbackEntityExtractor
 from .utils import get_first
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
+from functools import lru_cache
 import logging
 import time
 try:
@@ -24,7 +25,7 @@ class GremlinClient:
         try:
             endpoint = self.settings.kg_uri or "ws://localhost:8182/gremlin"
             logger.info(f"Attempting to connect to Gremlin at: {endpoint}")
-            self.client = client.Client(endpoint, 'g')
+            self.client = client.Client(endpoint, 'g', pool_size=8, max_workers=8)
             self._test_connection()
             logger.info(f"Successfully initialized Gremlin client: {endpoint}")
         except Exception as e:
@@ -40,19 +41,27 @@ class GremlinClient:
                 logger.error(f"Gremlin connection test failed: {e}")
                 raise Exception(f"Gremlin connection test failed: {e}")
     
-    def _execute_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+    def ping(self) -> None:
+        """Run a trivial query, raising if the server cannot be reached"""
+        self._test_connection()
+    
+    def _execute_query(self, query: str, parameters: Dict = None, timeout_ms: int = None) -> List[Dict]:
         if not self.client:
             raise Exception("Gremlin client not initialized")
         
         try:
-            if parameters:
-                result = self.client.submit(query, parameters)
-            else:
-                result = self.client.submit(query)
+            # evaluationTimeout makes the server abandon the traversal, not just the client
+            request_options = {"evaluationTimeout": timeout_ms} if timeout_ms else None
+            result = self.client.submit(query, parameters or None, request_options=request_options)
             return result.all().result()
         except Exception as e:
             logger.error(f"Query execution failed: {e}")
             raise
+    
+    def close(self):
+        if self.client:
+            self.client.close()
+            self.client = None
 
 class GremlinKG(BaseKnowledgeGraph):
     def __init__(self):
@@ -63,6 +72,14 @@ class GremlinKG(BaseKnowledgeGraph):
         self.entity_extractor = SpaCyEntityExtractor()
         logger.info("GremlinKG initialized successfully")
 
+    def close(self):
+        """Close the Gremlin connection pool"""
+        self.gremlin_client.close()
+
+    def ping(self) -> None:
+        """Check the Gremlin connection, keeping pooled websockets alive"""
+        self.gremlin_client.ping()
+
     def extract_entities(self, text: str) -> List[str]:
         entities = self.entity_extractor.extract_entities(text)
         if not entities:
@@ -134,10 +151,10 @@ class GremlinKG(BaseKnowledgeGraph):
         self.upsert(all_nodes, edges)
         logger.info(f"Stored content {doc_id} with {len(entities)} entities in Gremlin")
 
-    def get_all_entities(self) -> List[Dict[str, Any]]:
+    def get_all_entities(self, timeout_ms: int = None) -> List[Dict[str, Any]]:
         try:
             query = "g.V().valueMap(true).toList()"
-            result = self.gremlin_client._execute_query(query)
+            result = self.gremlin_client._execute_query(query, timeout_ms=timeout_ms)
             entities = []
             for item in result:
                 entity = {
@@ -153,29 +170,27 @@ class GremlinKG(BaseKnowledgeGraph):
 
     def get_whole_graph(self) -> Dict[str, Any]:
         try:
-            nodes_query = "g.V().valueMap(true).toList()"
-            nodes_result = self.gremlin_client._execute_query(nodes_query)
+            # One round-trip: each vertex with its outgoing edges and their targets
+            query = """
+            g.V().project('node', 'out')
+                .by(valueMap(true))
+                .by(outE().project('edge', 'inV')
+                    .by(valueMap(true))
+                    .by(inV().values('node_id').fold())
+                    .fold())
+                .toList()
+            """
+            result = self.gremlin_client._execute_query(query)
             nodes = []
-            for item in nodes_result:
-                node = {
-                    "id": get_first(item.get("node_id")),
-                    "label": get_first(item.get("label")),
-                    "properties": {k: get_first(v) for k, v in item.items() if k not in ["node_id", "label"]}
-                }
-                nodes.append(node)
-            
-            edges_query = "g.E().valueMap(true).toList()"
-            edges_result = self.gremlin_client._execute_query(edges_query)
             edges = []
-            for item in edges_result:
-                edge = {
-                    "id": get_first(item.get("id")),
-                    "label": get_first(item.get("label")),
-                    "outV": get_first(item.get("outV")),
-                    "inV": get_first(item.get("inV")),
-                    "properties": {k: get_first(v) for k, v in item.items() if k not in ["id", "label", "outV", "inV"]}
-                }
-                edges.append(edge)
+            for row in result:
+                node = self._node_from_value_map(row["node"])
+                nodes.append(node)
+                for out in row["out"]:
+                    edge = self._edge_from_value_map(out["edge"])
+                    edge["outV"] = node["id"]
+                    edge["inV"] = get_first(out["inV"])
+                    edges.append(edge)
             
             return {
                 "nodes": nodes,
@@ -187,38 +202,105 @@ class GremlinKG(BaseKnowledgeGraph):
             logger.error(f"Error retrieving whole graph: {e}")
             raise
 
+    @staticmethod
+    def _node_from_value_map(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": get_first(item.get("node_id")),
+            "label": get_first(item.get("label")),
+            "properties": {k: get_first(v) for k, v in item.items() if k not in ["node_id", "label"]}
+        }
+
+    @staticmethod
+    def _edge_from_value_map(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": get_first(item.get("id")),
+            "label": get_first(item.get("label")),
+            "outV": get_first(item.get("outV")),
+            "inV": get_first(item.get("inV")),
+            "properties": {k: get_first(v) for k, v in item.items() if k not in ["id", "label", "outV", "inV"]}
+        }
+
+    def _iter_pages(self, traversal: str, projection: str, page_size: int) -> Iterator[Dict[str, Any]]:
+        """Yield `projection` of `traversal` one page at a time using range()
+
+        Elements are ordered by id first; an unordered range() is not stable
+        between queries, so pages could skip or repeat elements.
+        """
+        offset = 0
+        while True:
+            query = f"{traversal}.order().by(T.id).range(low, high).{projection}.toList()"
+            page = self.gremlin_client._execute_query(query, {"low": offset, "high": offset + page_size})
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def iter_nodes(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield graph nodes in pages of page_size, holding one page in memory at a time."""
+        for item in self._iter_pages("g.V()", "valueMap(true)", page_size):
+            yield self._node_from_value_map(item)
+
+    def iter_edges(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield graph edges in pages of page_size, holding one page in memory at a time."""
+        # valueMap() of an edge has no endpoints; project them as get_whole_graph does
+        projection = (
+            "project('edge', 'outV', 'inV')"
+            ".by(valueMap(true))"
+            ".by(outV().values('node_id').fold())"
+            ".by(inV().values('node_id').fold())"
+        )
+        for item in self._iter_pages("g.E()", projection, page_size):
+            edge = self._edge_from_value_map(item["edge"])
+            edge["outV"] = get_first(item["outV"])
+            edge["inV"] = get_first(item["inV"])
+            yield edge
+
     def get_facts_for_entity(self, entity_name: str) -> list[str]:
         """Return a list of fact strings about the entity from the KG."""
-        facts = []
+        return self.get_facts_for_entities([entity_name]).get(entity_name, [])
+
+    def get_facts_for_entities(self, entity_names: List[str]) -> Dict[str, List[str]]:
+        """Return fact strings for several entities from one traversal, keyed by entity name.
+
+        Entities that are not in the graph are left out of the result.
+        """
+        names_by_id = {f"entity:{name.lower().replace(' ', '_')}": name for name in entity_names}
+        if not names_by_id:
+            return {}
+        facts_by_entity: Dict[str, List[str]] = {}
         try:
-            # Find the entity node by name
-            entity_id = f"entity:{entity_name.lower().replace(' ', '_')}"
-            query = "g.V().has('node_id', entity_id).valueMap(true).toList()"
-            result = self.gremlin_client._execute_query(query, {"entity_id": entity_id})
-            if result:
-                entity = result[0]
-                label = entity.get("label", ["Entity"])[0]
-                name = entity.get("name", [entity_name])[0]
+            # Each entity node with its properties and every neighbour across both edge directions
+            query = """
+            g.V().has('node_id', within(entity_ids)).project('node', 'related')
+                .by(valueMap(true))
+                .by(bothE().as('e').otherV().as('v').select('e', 'v').by(valueMap(true)).fold())
+                .toList()
+            """
+            result = self.gremlin_client._execute_query(query, {"entity_ids": list(names_by_id)})
+            for row in result:
+                entity = row["node"]
+                entity_name = names_by_id.get(get_first(entity.get("node_id")))
+                if entity_name is None:
+                    continue
+                label = get_first(entity.get("label")) or "Entity"
+                name = get_first(entity.get("name")) or entity_name
                 # Add properties as facts
-                for k, v in entity.items():
-                    if k not in ["node_id", "label", "name"]:
-                        facts.append(f"{name} ({label}) has {k}: {v[0] if isinstance(v, list) else v}")
+                facts = [
+                    f"{name} ({label}) has {k}: {get_first(v)}"
+                    for k, v in entity.items() if k not in ["node_id", "label", "name"]
+                ]
                 facts.append(f"{name} is a {label} node in the knowledge graph.")
-            # Find outgoing edges (relationships)
-            edge_query = """
-            g.V().has('node_id', entity_id).bothE().as('e').otherV().as('v').select('e','v').toList()
-            """
-            edge_results = self.gremlin_client._execute_query(edge_query, {"entity_id": entity_id})
-            for edge in edge_results:
-                e = edge.get("e", {})
-                v = edge.get("v", {})
-                edge_label = e.get("label", ["related"])[0] if isinstance(e.get("label"), list) else e.get("label", "related")
-                target_label = v.get("label", ["Node"])[0] if isinstance(v.get("label"), list) else v.get("label", "Node")
-                target_name = v.get("name", [v.get("node_id", ["unknown"])[0]])[0] if isinstance(v.get("name"), list) else v.get("name", v.get("node_id", "unknown"))
-                facts.append(f"{entity_name} {edge_label} {target_label}: {target_name}")
+                for related in row["related"]:
+                    e = related.get("e", {})
+                    v = related.get("v", {})
+                    edge_label = get_first(e.get("label")) or "related"
+                    target_label = get_first(v.get("label")) or "Node"
+                    target_name = get_first(v.get("name")) or get_first(v.get("node_id")) or "unknown"
+                    facts.append(f"{entity_name} {edge_label} {target_label}: {target_name}")
+                facts_by_entity[entity_name] = facts
         except Exception as e:
-            logger.warning(f"Could not get facts for entity '{entity_name}': {e}")
-        return facts
+            logger.warning(f"Could not get facts for entities {entity_names}: {e}")
+        return facts_by_entity
 
     def delete_all(self) -> bool:
         """Delete all nodes and edges from the knowledge graph."""
@@ -267,3 +349,17 @@ class GremlinKG(BaseKnowledgeGraph):
         except Exception as e:
             logger.error(f"Failed to get edge count: {e}")
             return 0
+
+@lru_cache(maxsize=1)
+def get_kg() -> GremlinKG:
+    """Get the shared GremlinKG instance, reusing its connection pool across requests.
+
+    Construction failures are not cached, so the next call retries the connection.
+    """
+    return GremlinKG()
+
+def close_kg() -> None:
+    """Close the shared GremlinKG, if one was created, so the next get_kg() reconnects"""
+    if get_kg.cache_info().currsize:
+        get_kg().close()
+        get_kg.cache_clear()
@@ -0,0 +1,106 @@
+import asyncio
+from typing import Callable, Generic, List, Optional, Set, Tuple, TypeVar
+from src.bootstrap.logger import get_logger
+from src.bootstrap.settings import settings
+from src.rag.vector_store import get_vectorstore
+
+logger = get_logger("batcher")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class QueryBatcher(Generic[T, R]):
+    """Coalesce concurrent calls into batched calls of a blocking handler
+
+    A consumer coroutine waits for the first item, collects whatever else
+    arrives within max_wait_ms (up to max_batch items), hands the batch to
+    handler in a worker thread and resolves each caller's future with its own
+    result. handler must return one result per item, in order.
+    """
+
+    def __init__(self, handler: Callable[[List[T]], List[R]], max_batch: int, max_wait_ms: float):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start the consumer on the running event loop, if it is not already running there"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._consumer = loop.create_task(self._consume(), name="query-batcher")
+
+    async def stop(self) -> None:
+        """Cancel the consumer and any batch in flight"""
+        tasks = [self._consumer, *self._running] if self._consumer else []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._consumer = None
+        self._running.clear()
+        self._loop = None
+
+    async def submit(self, item: T) -> R:
+        """Queue item for the next batch and wait for its result"""
+        self.start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Run the batch on its own so the next one can be collected meanwhile
+            task = loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        logger.debug("Running batch of %s", len(batch))
+        try:
+            results = await asyncio.to_thread(self.handler, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+def _embed_queries(queries: List[str]) -> List[Optional[List[float]]]:
+    """Embed a batch of queries, each distinct text once; None for all if embeddings are unavailable"""
+    vectorstore = get_vectorstore()
+    unique = list(dict.fromkeys(queries))
+    embeddings = vectorstore.embed_queries(unique) if vectorstore else None
+    if embeddings is None:
+        return [None] * len(queries)
+    by_query = dict(zip(unique, embeddings))
+    return [by_query[query] for query in queries]
+
+# Global batcher for search query embeddings
+embedding_batcher: QueryBatcher[str, Optional[List[float]]] = QueryBatcher(
+    _embed_queries,
+    max_batch=settings.search_batch_max_size,
+    max_wait_ms=settings.search_batch_max_wait_ms
+)
+
+def get_embedding_batcher() -> QueryBatcher[str, Optional[List[float]]]:
+    """Get the global search query embedding batcher"""
+    return embedding_batcher
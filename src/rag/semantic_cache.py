@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+from src.api.cache import graph_version
+from src.bootstrap.logger import get_logger
+from src.rag.batcher import get_embedding_batcher
+from src.rag.temporal_search import TemporalSearchQuery, TemporalSearchResult, TemporalSearchService
+
+logger = get_logger("semantic_cache")
+
+
+class SemanticCache:
+    """Cache of recent search results, matched by cosine similarity of query embeddings.
+
+    Near-identical queries (cosine >= threshold) with the same scope, e.g. the
+    requested result count, share one entry. Entries belong to a content version;
+    a newer version drops them all, so results never outlive a write.
+    """
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.97):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._version = -1
+        self._reset()
+
+    def _reset(self):
+        self._matrix: Optional[np.ndarray] = None  # allocated on first put, once the dimension is known
+        self._scopes: List[Hashable] = [None] * self.max_entries
+        self._payloads: List[Any] = [None] * self.max_entries
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        self._size = 0
+        self._tick = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        q = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def get(self, embedding: List[float], scope: Hashable, version: int) -> Optional[Any]:
+        """Return the payload of the closest cached query, or None on a miss"""
+        q = self._normalize(embedding)
+        with self._lock:
+            if version != self._version or self._size == 0:
+                return None
+            # One matrix-vector product scores every cached query
+            sims = self._matrix[:self._size] @ q
+            candidates = np.flatnonzero(sims >= self.threshold)
+            for idx in candidates[np.argsort(-sims[candidates])]:
+                if self._scopes[idx] == scope:
+                    self._tick += 1
+                    self._last_used[idx] = self._tick
+                    logger.debug(f"Semantic cache hit (cosine={sims[idx]:.3f})")
+                    return self._payloads[idx]
+            return None
+
+    def put(self, embedding: List[float], scope: Hashable, version: int, payload: Any) -> None:
+        """Cache payload for the query embedding, evicting the least recently used entry when full"""
+        q = self._normalize(embedding)
+        with self._lock:
+            if version < self._version:
+                return  # computed before a write that has since invalidated it
+            if version > self._version:
+                self._reset()
+                self._version = version
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, q.shape[0]), dtype=np.float32)
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._matrix[slot] = q
+            self._scopes[slot] = scope
+            self._payloads[slot] = payload
+            self._tick += 1
+            self._last_used[slot] = self._tick
+
+
+# Results of recent searches, shared by /search and /temporal/search
+SEARCH_CACHE = SemanticCache(max_entries=256, threshold=0.97)
+
+
+def search_scope(query: TemporalSearchQuery) -> Hashable:
+    """Cache scope of a query: everything besides its text that changes the results"""
+    return (
+        query.max_results,
+        tuple(query.video_ids) if query.video_ids else None,
+        query.entity_filter,
+        query.topic_filter,
+        tuple(query.time_range) if query.time_range else None
+    )
+
+
+async def embed_search_query(query: TemporalSearchQuery) -> Optional[List[float]]:
+    """Embed the searched text through the shared batcher, or return None if embedding fails"""
+    try:
+        return await get_embedding_batcher().submit(TemporalSearchService.search_text(query))
+    except Exception as e:
+        # search_entities embeds the query itself when it is given no embedding
+        logger.warning("Batched query embedding failed: %s", e)
+        return None
+
+
+async def cached_search(service: TemporalSearchService, query: TemporalSearchQuery,
+                        embedding: Optional[List[float]], scope: Hashable) -> List[TemporalSearchResult]:
+    """Run a temporal search, reusing the results of a near-identical recent query with the same scope
+
+    Without an embedding the search runs uncached. Empty results are never
+    cached, since search_entities also returns [] when the backend fails.
+    """
+    version = graph_version()
+    results = SEARCH_CACHE.get(embedding, scope, version) if embedding is not None else None
+    if results is None:
+        results = await asyncio.to_thread(service.search_entities, query, embedding)
+        if results and embedding is not None:
+            SEARCH_CACHE.put(embedding, scope, version, results)
+    return results
@@ -41,8 +41,17 @@ class TemporalSearchService:
         else:
             logger.warning("TemporalSearchService initialized without vector store")
     
-    def search_entities(self, query: TemporalSearchQuery) -> List[TemporalSearchResult]:
-        """Search for specific entities in video content"""
+    @staticmethod
+    def search_text(query: TemporalSearchQuery) -> str:
+        """The text embedded for a query: the query followed by its entity and topic filters"""
+        return " ".join(filter(None, (query.query, query.entity_filter, query.topic_filter)))
+    
+    def search_entities(self, query: TemporalSearchQuery, embedding: Optional[List[float]] = None) -> List[TemporalSearchResult]:
+        """Search for specific entities in video content
+
+        `embedding` may carry the already computed embedding of `search_text(query)`,
+        the text actually searched.
+        """
         start_time = time.time()
         logger.info(f"Starting temporal search: '{query.query}'")
         logger.info(f"Search parameters: max_results={query.max_results}, video_ids={query.video_ids}")
@@ -60,18 +69,21 @@ class TemporalSearchService:
         
         try:
             # Search vector store for relevant segments
-            search_query = query.query
-            if query.entity_filter:
-                search_query += f" {query.entity_filter}"
-            if query.topic_filter:
-                search_query += f" {query.topic_filter}"
+            search_query = self.search_text(query)
             
             logger.info(f"Executing vector search with query: '{search_query}'")
             
             # Get search results
-            results = self.vectorstore.search(search_query, k=query.max_results * 2)  # Get more to filter
+            if embedding is not None:
+                results = self.vectorstore.search_by_vector(embedding, k=query.max_results * 2)
+            else:
+                results = self.vectorstore.search(search_query, k=query.max_results * 2)  # Get more to filter
             logger.info(f"Vector search returned {len(results)} initial results")
             
+            # Resolve the filters once rather than per result
+            video_ids = set(query.video_ids) if query.video_ids else None
+            entity_filter = query.entity_filter.lower() if query.entity_filter else None
+            
             # Filter and process results
             temporal_results = []
             filtered_count = 0
@@ -86,7 +98,7 @@ class TemporalSearchService:
                     continue
                 
                 # Apply video filter
-                if query.video_ids and metadata.get("video_id") not in query.video_ids:
+                if video_ids and metadata.get("video_id") not in video_ids:
                     logger.debug(f"Filtering out video {metadata.get('video_id')} (not in requested list)")
                     filtered_count += 1
                     continue
@@ -100,9 +112,9 @@ class TemporalSearchService:
                         continue
                 
                 # Apply entity filter
-                if query.entity_filter:
+                if entity_filter:
                     entities = metadata.get("entities", [])
-                    if query.entity_filter.lower() not in [e.lower() for e in entities]:
+                    if not any(e.lower() == entity_filter for e in entities):
                         logger.debug(f"Filtering out segment (entity '{query.entity_filter}' not found)")
                         filtered_count += 1
                         continue
@@ -147,7 +159,7 @@ class TemporalSearchService:
             
             # Log summary of results
             if final_results:
-                video_ids_found = list(set(r.video_id for r in final_results))
+                video_ids_found = list({r.video_id for r in final_results})
                 logger.info(f"Found results in {len(video_ids_found)} videos: {video_ids_found}")
                 
                 # Log time ranges
@@ -166,7 +178,7 @@ class TemporalSearchService:
         if video_ids:
             logger.info(f"Filtering to videos: {video_ids}")
         
-        query = TemporalSearchQuery(
+        query = TemporalSearchQuery.model_construct(
             query=entity,
             video_ids=video_ids,
             entity_filter=entity,
@@ -180,7 +192,7 @@ class TemporalSearchService:
         if video_ids:
             logger.info(f"Filtering to videos: {video_ids}")
         
-        query = TemporalSearchQuery(
+        query = TemporalSearchQuery.model_construct(
             query=topic,
             video_ids=video_ids,
             topic_filter=topic,
@@ -247,10 +259,7 @@ class TemporalSearchService:
                 logger.info(f"Video duration: {total_duration:.1f}s")
                 
                 # Log entity statistics
-                all_entities = []
-                for segment in timeline:
-                    all_entities.extend(segment.entities)
-                unique_entities = list(set(all_entities))
+                unique_entities = list({entity for segment in timeline for entity in segment.entities})
                 logger.info(f"Total unique entities found: {len(unique_entities)}")
                 if unique_entities:
                     logger.info(f"Entities: {unique_entities[:10]}..." if len(unique_entities) > 10 else f"Entities: {unique_entities}")
@@ -4,13 +4,29 @@ from langchain.schema import Document
 from src.bootstrap.settings import settings
 from src.bootstrap.logger import get_logger
 from typing import List, Optional
+from functools import lru_cache
+from sqlalchemy import create_engine, text
+from cachetools import TTLCache
 import json
 import os
 import numpy as np
+import threading
 import time
 
 logger = get_logger("vector_store")
 
+# Recent search results keyed by (query, k), shared by every VectorStore in the
+# process. Local writes clear it; the TTL bounds staleness from other writers.
+SEARCH_CACHE_SIZE = 1024
+SEARCH_CACHE_TTL_SECONDS = 60
+_search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL_SECONDS)
+_search_cache_lock = threading.Lock()
+
+def clear_search_cache() -> None:
+    """Drop all cached search results"""
+    with _search_cache_lock:
+        _search_cache.clear()
+
 class MockEmbeddings:
     """Simple mock embeddings for testing when OpenAI API is not available."""
     
@@ -38,6 +54,37 @@ class MockEmbeddings:
         logger.debug("Mock embedding generated successfully")
         return embedding
 
+# Candidates fetched from the halfvec index per requested result, then rescored in float32
+HALFVEC_RESCORE_FACTOR = 4
+
+HALFVEC_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS langchain_pg_embedding_halfvec_idx
+ON langchain_pg_embedding
+USING hnsw ((embedding::halfvec({dim})) halfvec_cosine_ops)
+"""
+
+HALFVEC_SEARCH_SQL = """
+SELECT document, cmetadata FROM (
+    SELECT e.document, e.cmetadata, e.embedding
+    FROM langchain_pg_embedding e
+    JOIN langchain_pg_collection c ON c.uuid = e.collection_id
+    WHERE c.name = :collection
+    ORDER BY e.embedding::halfvec({dim}) <=> CAST(:query AS halfvec({dim}))
+    LIMIT :candidates
+) candidates
+ORDER BY embedding <=> CAST(:query AS vector)
+LIMIT :k
+"""
+
+@lru_cache(maxsize=1)
+def _halfvec_engine():
+    """Create the engine for halfvec searches, building the index on first use."""
+    engine = create_engine(settings.vectordb_uri, pool_pre_ping=True)
+    with engine.begin() as conn:
+        conn.execute(text(HALFVEC_INDEX_SQL.format(dim=settings.embedding_dimensions)))
+    logger.info("halfvec HNSW index ready")
+    return engine
+
 class VectorStore:
     def __init__(self):
         logger.info("Initializing VectorStore")
@@ -93,6 +140,7 @@ class VectorStore:
             )
             
             self.vectorstore.add_documents([document])
+            clear_search_cache()
             
             storage_time = time.time() - start_time
             logger.debug(f"Document {doc_id} stored successfully in {storage_time:.2f}s")
@@ -108,11 +156,58 @@ class VectorStore:
             logger.error("Vector store not available")
             return []
             
+        with _search_cache_lock:
+            cached = _search_cache.get((query, k))
+        if cached is not None:
+            logger.debug(f"Search cache hit for: '{query}' (k={k})")
+            return list(cached)
+            
         try:
             start_time = time.time()
             logger.debug(f"Searching for: '{query}' (k={k})")
             
-            results = self.vectorstore.similarity_search(query, k=k)
+            if settings.vector_halfvec_search:
+                results = self._halfvec_search(self.embeddings.embed_query(query), k)
+            else:
+                results = self.vectorstore.similarity_search(query, k=k)
+            
+            search_time = time.time() - start_time
+            logger.debug(f"Search completed in {search_time:.2f}s, found {len(results)} results")
+            
+            if results:
+                with _search_cache_lock:
+                    _search_cache[(query, k)] = list(results)
+            return results
+        except Exception as e:
+            logger.error(f"Failed to search vector store: {e}")
+            return []
+
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a search query with the store's embedding model."""
+        if self.embeddings is None:
+            return None
+        return self.embeddings.embed_query(query)
+
+    def embed_queries(self, queries: List[str]) -> Optional[List[List[float]]]:
+        """Embed several search queries with one call to the embedding model."""
+        if self.embeddings is None:
+            return None
+        return self.embeddings.embed_documents(queries)
+
+    def search_by_vector(self, embedding: List[float], k: int = 5) -> List[Document]:
+        """Search for documents similar to an already computed query embedding."""
+        if self.vectorstore is None:
+            logger.error("Vector store not available")
+            return []
+            
+        try:
+            start_time = time.time()
+            logger.debug(f"Searching by vector (k={k})")
+            
+            if settings.vector_halfvec_search:
+                results = self._halfvec_search(embedding, k)
+            else:
+                results = self.vectorstore.similarity_search_by_vector(embedding, k=k)
             
             search_time = time.time() - start_time
             logger.debug(f"Search completed in {search_time:.2f}s, found {len(results)} results")
@@ -122,6 +217,19 @@ class VectorStore:
             logger.error(f"Failed to search vector store: {e}")
             return []
 
+    def _halfvec_search(self, embedding: List[float], k: int) -> List[Document]:
+        """Approximate search on the fp16 index, rescoring the candidates with full-precision vectors."""
+        query = text(HALFVEC_SEARCH_SQL.format(dim=settings.embedding_dimensions))
+        params = {
+            "collection": "multimodal_rag",
+            "query": str(list(embedding)),
+            "candidates": k * HALFVEC_RESCORE_FACTOR,
+            "k": k,
+        }
+        with _halfvec_engine().connect() as conn:
+            rows = conn.execute(query, params).all()
+        return [Document(page_content=document, metadata=metadata or {}) for document, metadata in rows]
+
     def delete_all(self) -> bool:
         """Delete all documents from the vector store."""
         if self.vectorstore is None:
@@ -135,6 +243,7 @@ class VectorStore:
             # For PGVector, we need to delete from the collection
             # This will delete all documents in the collection
             self.vectorstore.delete_collection()
+            clear_search_cache()
             
             # Recreate the collection
             self.vectorstore = PGVector(
@@ -168,16 +277,29 @@ class VectorStore:
             logger.error(f"Failed to get document count: {e}")
             return 0
 
+# The shared VectorStore; built on first successful use so its engine and
+# embeddings client are reused by every caller
+_vectorstore: Optional["VectorStore"] = None
+_vectorstore_lock = threading.Lock()
+
 def get_vectorstore() -> Optional[VectorStore]:
-    """Get vector store instance."""
-    try:
-        logger.info("Creating vector store instance")
-        vectorstore = VectorStore()
-        if vectorstore.vectorstore is None:
-            logger.error("Vector store not properly initialized")
+    """Get the shared vector store instance, or None if it cannot be initialized.
+
+    Failures are not cached, so a later call retries once the database is reachable.
+    """
+    global _vectorstore
+    with _vectorstore_lock:
+        if _vectorstore is not None:
+            return _vectorstore
+        try:
+            logger.info("Creating vector store instance")
+            vectorstore = VectorStore()
+            if vectorstore.vectorstore is None:
+                logger.error("Vector store not properly initialized")
+                return None
+            logger.info("Vector store instance created successfully")
+            _vectorstore = vectorstore
+            return vectorstore
+        except Exception as e:
+            logger.error(f"Failed to create vector store: {e}")
             return None
-        logger.info("Vector store instance created successfully")
-        return vectorstore
-    except Exception as e:
-        logger.error(f"Failed to create vector store: {e}")
-        return None
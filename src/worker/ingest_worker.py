@@ -1,6 +1,6 @@
 import argparse
 from src.rag.vector_store import get_vectorstore
-from src.kg.gremlin_client import GremlinKG
+from src.kg.gremlin_client import get_kg
 from src.bootstrap.logger import get_logger
 from src.worker.strategies.youtube import YouTubeIngestStrategy
 # from src.worker.strategies.twitter import TwitterIngestStrategy
@@ -14,35 +14,38 @@ STRATEGY_REGISTRY = {
     # 'instagram': InstagramIngestStrategy,
 }
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--videos", nargs="*", help="YouTube video IDs or URLs")
-    parser.add_argument("--twitter", nargs="*", help="Twitter query terms")
-    parser.add_argument("--ig", nargs="*", help="Instagram post URLs")
-    args = parser.parse_args()
-
+def run(videos=None, twitter=None, ig=None):
+    """Ingest the given sources in-process, reusing the shared knowledge graph client"""
     vectordb = get_vectorstore()
-    kg = GremlinKG()
+    kg = get_kg()
 
-    if args.videos:
+    if videos:
         logger.info("[JOB] YouTube ingestion started")
         strategy = STRATEGY_REGISTRY['youtube'](vectordb=vectordb, kg=kg)
-        strategy.ingest(args.videos)
+        strategy.ingest(videos)
         logger.info("[JOB] YouTube ingestion finished")
 
-    # if args.twitter:
+    # if twitter:
     #     logger.info("[JOB] Twitter ingestion started")
     #     strategy = STRATEGY_REGISTRY['twitter'](vectordb=vectordb, kg=kg)
-    #     strategy.ingest(args.twitter)
+    #     strategy.ingest(twitter)
     #     logger.info("[JOB] Twitter ingestion finished")
 
-    # if args.ig:
+    # if ig:
     #     logger.info("[JOB] Instagram ingestion started")
     #     strategy = STRATEGY_REGISTRY['instagram'](vectordb=vectordb, kg=kg)
-    #     strategy.ingest(args.ig)
+    #     strategy.ingest(ig)
     #     logger.info("[JOB] Instagram ingestion finished")
 
     logger.info("[JOB] IngestWorker finished successfully")
 
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", nargs="*", help="YouTube video IDs or URLs")
+    parser.add_argument("--twitter", nargs="*", help="Twitter query terms")
+    parser.add_argument("--ig", nargs="*", help="Instagram post URLs")
+    args = parser.parse_args()
+    run(videos=args.videos, twitter=args.twitter, ig=args.ig)
+
 if __name__ == "__main__":
     main()
@@ -1,5 +1,5 @@
 from .base import BaseIngestStrategy
-from src.ingest.youtube import YouTubeVideoSource, YouTubeSource
+from src.ingest.youtube import YouTubeSource, get_video_source
 from src.ingest.base import ContentItem, VideoContentItem
 from datetime import datetime
 import re
@@ -8,14 +8,15 @@ import time
 
 logger = get_logger("youtube_strategy")
 
+YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)'),
+    re.compile(r'youtube\.com/v/([^&\n?#]+)'),
+]
+
 def extract_youtube_id(url: str) -> str:
     """Extract YouTube video ID from various URL formats."""
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\n?#]+)',
-        r'youtube\.com/v/([^&\n?#]+)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return url
@@ -30,7 +31,8 @@ class YouTubeIngestStrategy(BaseIngestStrategy):
         
         # Use new temporal video processing
         logger.info("Processing videos with temporal video processing...")
-        video_items = self.fetch_video_content(video_ids)
+        # Store each video as soon as it is fetched rather than after the whole list
+        video_items = get_video_source().fetch_video(video_ids)
         for i, item in enumerate(video_items, 1):
             logger.info(f"[{i}/{len(video_ids)}] Processing video item: {item.id}")
             self.process_video_item(item)
@@ -51,14 +53,6 @@ class YouTubeIngestStrategy(BaseIngestStrategy):
         logger.info(f"Extracted {len(video_ids)} video IDs: {video_ids}")
         return video_ids
 
-    def fetch_video_content(self, video_ids: list[str]) -> list[VideoContentItem]:
-        """Fetch video content with temporal segments"""
-        logger.info(f"Fetching video content for {len(video_ids)} videos")
-        yt_source = YouTubeVideoSource()
-        video_items = list(yt_source.fetch_video(video_ids))
-        logger.info(f"Fetched {len(video_items)} video items")
-        return video_items
-
     def fetch_legacy_content(self, video_ids: list[str]) -> list[ContentItem]:
         """Fetch content using legacy method for backward compatibility"""
         logger.info(f"Fetching legacy content for {len(video_ids)} videos")
@@ -9,7 +9,7 @@ class TestIngestEndpoint:
     
     def test_ingest_with_all_sources(self, client, sample_ingest_request):
         """Test ingest endpoint with all data sources"""
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=sample_ingest_request)
             
             assert response.status_code == 200
@@ -23,7 +23,7 @@ class TestIngestEndpoint:
     
     def test_ingest_with_videos_only(self, client, sample_video_only_request):
         """Test ingest endpoint with only video URLs"""
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=sample_video_only_request)
             
             assert response.status_code == 200
@@ -35,7 +35,7 @@ class TestIngestEndpoint:
     
     def test_ingest_with_twitter_only(self, client, sample_twitter_only_request):
         """Test ingest endpoint with only Twitter URLs"""
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=sample_twitter_only_request)
             
             assert response.status_code == 200
@@ -47,7 +47,7 @@ class TestIngestEndpoint:
     
     def test_ingest_with_empty_request(self, client, sample_empty_request):
         """Test ingest endpoint with empty request"""
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=sample_empty_request)
             
             assert response.status_code == 200
@@ -66,7 +66,7 @@ class TestIngestEndpoint:
             "twitter": ["https://twitter.com/test/status/123"]
         }
         
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=request_data)
             
             assert response.status_code == 200
@@ -93,7 +93,7 @@ class TestIngestEndpoint:
             ]
         }
         
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=request_data)
             
             assert response.status_code == 200
@@ -115,7 +115,7 @@ class TestIngestEndpoint:
     
     def test_ingest_with_missing_content_type(self, client, sample_ingest_request):
         """Test ingest endpoint without Content-Type header"""
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", data=json.dumps(sample_ingest_request))
             assert response.status_code == 200  # FastAPI should still process it
     
@@ -127,7 +127,7 @@ class TestIngestEndpoint:
             "ig": None
         }
         
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=request_data)
             
             assert response.status_code == 200
@@ -164,7 +164,7 @@ class TestEntitiesEndpoint:
             }
         ]
         
-        with patch('src.api.routers.entities.GremlinKG') as mock_kg:
+        with patch('src.api.routers.entities.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_all_entities.return_value = mock_entities
             mock_kg.return_value = mock_kg_instance
@@ -190,7 +190,7 @@ class TestEntitiesEndpoint:
     
     def test_get_entities_empty(self, client):
         """Test retrieval of entities when knowledge graph is empty"""
-        with patch('src.api.routers.entities.GremlinKG') as mock_kg:
+        with patch('src.api.routers.entities.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_all_entities.return_value = []
             mock_kg.return_value = mock_kg_instance
@@ -213,7 +213,7 @@ class TestEntitiesEndpoint:
     
     def test_get_entities_error(self, client):
         """Test error handling when knowledge graph fails"""
-        with patch('src.api.routers.entities.GremlinKG') as mock_kg:
+        with patch('src.api.routers.entities.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_all_entities.side_effect = Exception("Database connection failed")
             mock_kg.return_value = mock_kg_instance
@@ -226,6 +226,23 @@ class TestEntitiesEndpoint:
             assert data["status"] == "error"
             assert "message" in data
             assert data["entities"] == []
+    
+    def test_get_entities_cached_until_graph_changes(self, client):
+        """Test that repeated reads hit the cache until the graph is written"""
+        with patch('src.api.routers.entities.get_kg') as mock_kg, \
+             patch('src.api.routers.graph.get_kg', mock_kg):
+            mock_kg_instance = MagicMock()
+            mock_kg_instance.get_all_entities.return_value = []
+            mock_kg_instance.delete_all.return_value = True
+            mock_kg.return_value = mock_kg_instance
+            
+            client.get("/entities")
+            client.get("/entities")
+            assert mock_kg_instance.get_all_entities.call_count == 1
+            
+            client.delete("/graph")
+            client.get("/entities")
+            assert mock_kg_instance.get_all_entities.call_count == 2
 
 class TestGraphEndpoint:
     """Test cases for the /graph endpoint"""
@@ -266,7 +283,7 @@ class TestGraphEndpoint:
             "total_edges": 1
         }
         
-        with patch('src.api.routers.graph.GremlinKG') as mock_kg:
+        with patch('src.api.routers.graph.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_whole_graph.return_value = mock_graph
             mock_kg.return_value = mock_kg_instance
@@ -290,7 +307,7 @@ class TestGraphEndpoint:
             "total_edges": 0
         }
         
-        with patch('src.api.routers.graph.GremlinKG') as mock_kg:
+        with patch('src.api.routers.graph.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_whole_graph.return_value = empty_graph
             mock_kg.return_value = mock_kg_instance
@@ -308,7 +325,7 @@ class TestGraphEndpoint:
     
     def test_get_graph_error(self, client):
         """Test error handling when knowledge graph fails"""
-        with patch('src.api.routers.graph.GremlinKG') as mock_kg:
+        with patch('src.api.routers.graph.get_kg') as mock_kg:
             mock_kg_instance = MagicMock()
             mock_kg_instance.get_whole_graph.side_effect = Exception("Graph retrieval failed")
             mock_kg.return_value = mock_kg_instance
@@ -322,6 +339,30 @@ class TestGraphEndpoint:
             assert "message" in data
             assert data["graph"]["total_nodes"] == 0
             assert data["graph"]["total_edges"] == 0
+    
+    def test_stream_graph_ndjson(self, client):
+        """Test that /graph/stream emits one tagged node or edge per line"""
+        with patch('src.api.routers.graph.get_kg') as mock_kg:
+            mock_kg_instance = MagicMock()
+            mock_kg_instance.iter_nodes.return_value = iter([
+                {"id": "youtube:dQw4w9WgXcQ", "label": "Content", "properties": {}},
+                {"id": "entity:test_entity", "label": "Entity", "properties": {}}
+            ])
+            mock_kg_instance.iter_edges.return_value = iter([
+                {"id": "edge1", "label": "contains_entity", "outV": "v1", "inV": "v2", "properties": {}}
+            ])
+            mock_kg.return_value = mock_kg_instance
+            
+            response = client.get("/graph/stream")
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            # Streams are not gzipped, so records reach the client as they are produced
+            assert "content-encoding" not in response.headers
+            records = [json.loads(line) for line in response.text.splitlines()]
+            assert [r["type"] for r in records] == ["node", "node", "edge"]
+            assert records[0]["id"] == "youtube:dQw4w9WgXcQ"
+            assert records[2]["label"] == "contains_entity"
 
 class TestSearchEndpoint:
     """Test cases for the /search endpoint"""
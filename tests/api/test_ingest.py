@@ -4,10 +4,11 @@ from unittest.mock import patch, MagicMock
 import json
 from src.api.routers.ingest import router as ingest_router
 from src.api.main import app
+from src.bootstrap.settings import settings
 
 class TestIngestEndpoint:
     def test_ingest_with_all_sources(self, client, sample_ingest_request):
-        with patch('subprocess.run') as mock_run:
+        with patch('src.api.routers.ingest.run_worker') as mock_run:
             response = client.post("/ingest", json=sample_ingest_request)
             assert response.status_code == 200
             data = response.json()
@@ -17,6 +18,11 @@ class TestIngestEndpoint:
             assert "--videos" in data["cmd"]
             assert "--twitter" in data["cmd"]
             assert "--ig" in data["cmd"]
+    
+    def test_ingest_rejects_too_many_videos(self, client):
+        videos = [f"https://www.youtube.com/watch?v={i}" for i in range(settings.ingest_max_items + 1)]
+        response = client.post("/ingest", json={"videos": videos})
+        assert response.status_code == 422
     # ... (repeat for all other /ingest tests from test_handler.py) 
 
 class TestYouTubeIngestStrategy:
@@ -46,10 +52,10 @@ class TestYouTubeIngestStrategy:
         mock_segment.confidence = 1.0
         mock_video_item.segments = [mock_segment]
         
-        with patch("src.worker.strategies.youtube.YouTubeVideoSource") as mock_source_cls:
+        with patch("src.worker.strategies.youtube.get_video_source") as mock_get_source:
             mock_source = MagicMock()
             mock_source.fetch_video.return_value = [mock_video_item]
-            mock_source_cls.return_value = mock_source
+            mock_get_source.return_value = mock_source
             strategy = YouTubeIngestStrategy(vectordb=mock_vectordb, kg=mock_kg)
             strategy.ingest(["testid"])
             # Assert store_content_with_entities called for video and segment
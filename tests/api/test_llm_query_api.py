@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch, Mock
 from fastapi.testclient import TestClient
 from src.api.main import app
 
@@ -21,4 +22,16 @@ def test_llm_query_basic():
     # The relevant_splits should be a list of dicts (may be empty if no data)
     for split in data["relevant_splits"]:
         assert "content" in split
-        assert "split_number" in split 
\ No newline at end of file
+        assert "split_number" in split
+
+def test_llm_query_stream_no_splits():
+    vectorstore = Mock()
+    vectorstore.search.return_value = []
+    with patch('src.api.routers.llm.get_vectorstore', return_value=vectorstore), \
+         patch('src.api.routers.llm.get_kg', side_effect=Exception("KG down")):
+        response = client.post("/llm/query/stream", json={"question": "anything", "k": 3})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n")[0] for block in response.text.strip().split("\n\n")]
+    assert events == ["event: context", "event: token", "event: done"]
+    assert '"No relevant video splits found."' in response.text
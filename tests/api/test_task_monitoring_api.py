@@ -1 +1,252 @@
- 
\ No newline at end of file
+import asyncio
+import json
+import pytest
+from src.api.task_tracker import get_task_tracker
+
+class TestTaskStats:
+    """Test cases for the /tasks/stats endpoint"""
+    
+    def test_stats_etag_revalidation(self, client):
+        """Test that unchanged stats answer If-None-Match with 304"""
+        response = client.get("/tasks/stats")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "public, max-age=2"
+        etag = response.headers["etag"]
+        
+        response = client.get("/tasks/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_stats_etag_changes_with_stats(self, client):
+        """Test that a new task invalidates the previous ETag"""
+        etag = client.get("/tasks/stats").headers["etag"]
+        asyncio.run(get_task_tracker().add_task(["test"]))
+        
+        response = client.get("/tasks/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_stats_track_transitions(self, client):
+        """Test that stats follow tasks through start, completion, failure and cleanup"""
+        tracker = get_task_tracker()
+        before = client.get("/tasks/stats").json()
+        started, succeeded, failed = (asyncio.run(tracker.add_task(["test"])) for _ in range(3))
+        asyncio.run(tracker.start_task(started))
+        asyncio.run(tracker.complete_task(succeeded, success=True))
+        asyncio.run(tracker.complete_task(failed, success=False, error_message="boom"))
+        
+        after = client.get("/tasks/stats").json()
+        assert after["total_tasks"] == before["total_tasks"] + 3
+        assert after["running_tasks"] == before["running_tasks"] + 1
+        assert after["completed_tasks"] == before["completed_tasks"] + 1
+        assert after["failed_tasks"] == before["failed_tasks"] + 1
+        
+        asyncio.run(tracker.cleanup_old_tasks(days=0))
+        cleaned = client.get("/tasks/stats").json()
+        assert cleaned["completed_tasks"] == 0
+        assert cleaned["failed_tasks"] == 0
+        assert cleaned["running_tasks"] == after["running_tasks"]
+
+class TestTaskSnapshot:
+    """Test cases for the /tasks/snapshot endpoint"""
+    
+    def test_snapshot_is_consistent(self, client):
+        """Test that the snapshot counts match its task lists"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        asyncio.run(tracker.start_task(task_id))
+        
+        response = client.get("/tasks/snapshot")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stats"]["running_tasks"] == data["running"]["total_count"]
+        assert data["stats"]["pending_tasks"] == data["pending"]["total_count"]
+        assert task_id in {task["task_id"] for task in data["running"]["tasks"]}
+
+class TestRunningTasks:
+    """Test cases for the /tasks/running and /tasks/count/running endpoints"""
+    
+    def test_running_count_matches_running_list(self, client):
+        """Test that the count endpoint agrees with the running list"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        asyncio.run(tracker.start_task(task_id))
+        asyncio.run(tracker.add_task(["test"]))
+        
+        running = client.get("/tasks/running").json()
+        count = client.get("/tasks/count/running").json()
+        
+        assert task_id in [task["task_id"] for task in running["tasks"]]
+        assert all(task["status"] == "running" for task in running["tasks"])
+        assert count["running_tasks"] == running["total_count"]
+
+class TestAllTasks:
+    """Test cases for the /tasks/all endpoint"""
+    
+    def test_all_tasks_is_valid_json(self, client):
+        """Test that the streamed listing parses as a single JSON document"""
+        tracker = get_task_tracker()
+        task_ids = [asyncio.run(tracker.add_task(["test", str(i)])) for i in range(3)]
+        
+        response = client.get("/tasks/all?limit=1000")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == len(data["tasks"])
+        returned_ids = {task["task_id"] for task in data["tasks"]}
+        assert set(task_ids) <= returned_ids
+    
+    def test_all_tasks_respects_limit(self, client):
+        """Test that limit caps the number of streamed tasks"""
+        tracker = get_task_tracker()
+        for i in range(3):
+            asyncio.run(tracker.add_task(["test", str(i)]))
+        
+        response = client.get("/tasks/all?limit=2")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["tasks"]) == 2
+        assert data["total_count"] == 2
+
+    def test_all_tasks_cursor_pages_without_overlap(self, client):
+        """Test that following next_cursor walks the listing page by page"""
+        tracker = get_task_tracker()
+        task_ids = [asyncio.run(tracker.add_task(["test", str(i)])) for i in range(5)]
+        
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"before": cursor} if cursor else {})}
+            data = client.get("/tasks/all", params=params).json()
+            seen.extend(task["task_id"] for task in data["tasks"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        
+        assert len(seen) == len(set(seen))
+        assert set(task_ids) <= set(seen)
+    
+    def test_all_tasks_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected"""
+        response = client.get("/tasks/all", params={"before": "not-a-cursor"})
+        assert response.status_code == 400
+
+class TestTaskStatuses:
+    """Test cases for the /tasks/statuses endpoint"""
+    
+    def test_statuses_mixed_ids(self, client):
+        """Test batch lookup with known and unknown task IDs"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"], metadata={"request_type": "test"}))
+        
+        response = client.post("/tasks/statuses", json={"task_ids": [task_id, "non-existent-task-id"]})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["found_count"] == 1
+        assert data["statuses"][task_id]["status"] == "pending"
+        assert data["statuses"]["non-existent-task-id"] is None
+    
+    def test_statuses_requires_task_ids(self, client):
+        """Test batch lookup without a task_ids field"""
+        response = client.post("/tasks/statuses", json={})
+        assert response.status_code == 422
+
+class TestTaskLongPoll:
+    """Test cases for long-polling /tasks/{task_id}"""
+    
+    def test_long_poll_times_out_with_current_state(self, client):
+        """Test that an idle task is returned unchanged after the timeout"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        
+        response = client.get(f"/tasks/{task_id}", params={"wait_for_change": True, "timeout": 0.1})
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+    
+    def test_long_poll_finished_task_returns_immediately(self, client):
+        """Test that a finished task is not held open"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        asyncio.run(tracker.complete_task(task_id, success=True))
+        
+        response = client.get(f"/tasks/{task_id}", params={"wait_for_change": True, "timeout": 60})
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+    
+    def test_finished_task_forgotten_after_cleanup(self, client):
+        """Test that a cached finished task is not served once cleanup removes it"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        asyncio.run(tracker.complete_task(task_id, success=True))
+        assert client.get(f"/tasks/{task_id}").status_code == 200
+        
+        client.delete("/tasks/cleanup", params={"days": 0})
+        
+        assert client.get(f"/tasks/{task_id}").status_code == 404
+
+class TestTaskProgress:
+    """Test cases for batched progress updates"""
+    
+    def test_progress_batch_keeps_latest_message(self, client):
+        """Test that a batch leaves the task showing its last message"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"]))
+        
+        assert asyncio.run(tracker.update_progress_batch(task_id, ["video 1/2", "video 2/2"]))
+        assert asyncio.run(tracker.update_progress_batch(task_id, []))
+        
+        response = client.get(f"/tasks/{task_id}")
+        assert response.json()["progress"] == "video 2/2"
+    
+    def test_progress_batch_unknown_task(self):
+        """Test that batching progress for an unknown task reports failure"""
+        assert not asyncio.run(get_task_tracker().update_progress_batch("missing", ["x"]))
+
+class TestTaskStream:
+    """Test cases for the /tasks/{task_id}/stream endpoint"""
+    
+    def test_stream_unknown_task(self, client):
+        """Test streaming a task that does not exist"""
+        response = client.get("/tasks/non-existent-task-id/stream")
+        assert response.status_code == 404
+    
+    def test_stream_finished_task(self, client):
+        """Test that a finished task emits its final state and closes the stream"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"], metadata={"request_type": "test"}))
+        asyncio.run(tracker.start_task(task_id))
+        asyncio.run(tracker.complete_task(task_id, success=True))
+        
+        with client.stream("GET", f"/tasks/{task_id}/stream") as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [
+                json.loads(line[len("data:"):])
+                for line in response.iter_lines()
+                if line.startswith("data:")
+            ]
+        
+        assert len(events) == 1
+        assert events[0]["task_id"] == task_id
+        assert events[0]["status"] == "completed"
+
+class TestTaskWebSocket:
+    """Test cases for the /ws/tasks/{task_id} endpoint"""
+    
+    def test_websocket_finished_task(self, client):
+        """Test that a finished task sends its full state and closes the socket"""
+        tracker = get_task_tracker()
+        task_id = asyncio.run(tracker.add_task(["test"], metadata={"request_type": "test"}))
+        asyncio.run(tracker.complete_task(task_id, success=False, error_message="boom"))
+        
+        with client.websocket_connect(f"/ws/tasks/{task_id}") as ws:
+            state = ws.receive_json()
+        
+        assert state["task_id"] == task_id
+        assert state["status"] == "failed"
+        assert state["error_message"] == "boom"
@@ -1,6 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
+from src.api.cache import bump_graph_version
+from src.rag.vector_store import clear_search_cache
 import tempfile
 import os
 import sys
@@ -8,6 +10,12 @@ import sys
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+@pytest.fixture(autouse=True)
+def clear_graph_cache():
+    """Drop cached graph reads and search results so each test sees its own mocks"""
+    bump_graph_version()
+    clear_search_cache()
+
 @pytest.fixture
 def client():
     """Test client for FastAPI app"""
@@ -0,0 +1,56 @@
+import asyncio
+from src.rag.batcher import QueryBatcher
+
+class TestQueryBatcher:
+    """Test cases for the QueryBatcher micro-batching layer"""
+
+    def test_concurrent_submits_share_one_batch(self):
+        """Test that items submitted together reach the handler as one batch, results in order"""
+        batches = []
+
+        def handler(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        async def scenario():
+            batcher = QueryBatcher(handler, max_batch=10, max_wait_ms=50)
+            try:
+                return await asyncio.gather(*(batcher.submit(n) for n in range(4)))
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(scenario()) == [0, 2, 4, 6]
+        assert batches == [[0, 1, 2, 3]]
+
+    def test_batches_are_capped_at_max_batch(self):
+        """Test that a burst larger than max_batch is split"""
+        batches = []
+
+        def handler(items):
+            batches.append(len(items))
+            return items
+
+        async def scenario():
+            batcher = QueryBatcher(handler, max_batch=2, max_wait_ms=50)
+            try:
+                return await asyncio.gather(*(batcher.submit(n) for n in range(5)))
+            finally:
+                await batcher.stop()
+
+        assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+        assert batches == [2, 2, 1]
+
+    def test_handler_error_reaches_every_caller(self):
+        """Test that a failing batch raises in each waiting caller"""
+        def handler(items):
+            raise RuntimeError("boom")
+
+        async def scenario():
+            batcher = QueryBatcher(handler, max_batch=10, max_wait_ms=10)
+            try:
+                return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+            finally:
+                await batcher.stop()
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from src.api.ingest_queue import IngestQueue, IngestQueueFull
+
+class TestIngestQueue:
+    """Test cases for the IngestQueue worker pool"""
+
+    def test_jobs_run_at_most_workers_at_a_time(self):
+        """Test that queued jobs all run, never more at once than there are workers"""
+        async def scenario():
+            queue = IngestQueue(workers=2, max_queued=10)
+            running = 0
+            peak = 0
+            done = []
+
+            async def job(n):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                done.append(n)
+
+            for n in range(5):
+                queue.submit(job, n)
+            await queue._queue.join()
+            await queue.stop()
+            return peak, sorted(done)
+
+        peak, done = asyncio.run(scenario())
+        assert peak == 2
+        assert done == [0, 1, 2, 3, 4]
+
+    def test_failing_job_does_not_stop_worker(self):
+        """Test that a worker keeps serving jobs after one raises"""
+        async def scenario():
+            queue = IngestQueue(workers=1, max_queued=10)
+            done = []
+
+            async def failing():
+                raise RuntimeError("boom")
+
+            async def ok():
+                done.append(True)
+
+            queue.submit(failing)
+            queue.submit(ok)
+            await queue._queue.join()
+            await queue.stop()
+            return done
+
+        assert asyncio.run(scenario()) == [True]
+
+    def test_full_queue_rejects_jobs(self):
+        """Test that submitting past capacity raises IngestQueueFull"""
+        async def scenario():
+            queue = IngestQueue(workers=1, max_queued=1)
+
+            async def job():
+                await asyncio.sleep(0)
+
+            queue.submit(job)
+            try:
+                with pytest.raises(IngestQueueFull):
+                    queue.submit(job)
+            finally:
+                await queue.stop()
+
+        asyncio.run(scenario())
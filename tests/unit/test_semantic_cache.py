@@ -0,0 +1,51 @@
+import pytest
+from src.rag.semantic_cache import SemanticCache
+
+class TestSemanticCache:
+    """Test cases for the SemanticCache used by /search"""
+    
+    def test_near_identical_query_hits(self):
+        """Test that a query within the cosine threshold returns the cached payload"""
+        cache = SemanticCache(threshold=0.97)
+        cache.put([1.0, 0.0, 0.0], scope=5, version=0, payload=["result"])
+        
+        assert cache.get([0.99, 0.05, 0.0], scope=5, version=0) == ["result"]
+    
+    def test_dissimilar_query_misses(self):
+        """Test that a query below the threshold is a miss"""
+        cache = SemanticCache(threshold=0.97)
+        cache.put([1.0, 0.0, 0.0], scope=5, version=0, payload=["result"])
+        
+        assert cache.get([0.0, 1.0, 0.0], scope=5, version=0) is None
+    
+    def test_scope_must_match(self):
+        """Test that the same query with a different result count is a miss"""
+        cache = SemanticCache()
+        cache.put([1.0, 0.0], scope=5, version=0, payload=["five"])
+        
+        assert cache.get([1.0, 0.0], scope=10, version=0) is None
+    
+    def test_new_version_invalidates(self):
+        """Test that entries from an older content version are not served"""
+        cache = SemanticCache()
+        cache.put([1.0, 0.0], scope=5, version=0, payload=["old"])
+        
+        assert cache.get([1.0, 0.0], scope=5, version=1) is None
+        
+        # A late write for the old version must not replace newer entries
+        cache.put([0.0, 1.0], scope=5, version=1, payload=["new"])
+        cache.put([1.0, 0.0], scope=5, version=0, payload=["stale"])
+        assert cache.get([1.0, 0.0], scope=5, version=1) is None
+        assert cache.get([0.0, 1.0], scope=5, version=1) == ["new"]
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test LRU eviction once the cache is full"""
+        cache = SemanticCache(max_entries=2)
+        cache.put([1.0, 0.0, 0.0], scope=5, version=0, payload="a")
+        cache.put([0.0, 1.0, 0.0], scope=5, version=0, payload="b")
+        cache.get([1.0, 0.0, 0.0], scope=5, version=0)
+        cache.put([0.0, 0.0, 1.0], scope=5, version=0, payload="c")
+        
+        assert cache.get([1.0, 0.0, 0.0], scope=5, version=0) == "a"
+        assert cache.get([0.0, 1.0, 0.0], scope=5, version=0) is None
+        assert cache.get([0.0, 0.0, 1.0], scope=5, version=0) == "c"
@@ -0,0 +1,21 @@
+import pytest
+from src.worker.strategies.youtube import extract_youtube_id
+
+class TestExtractYouTubeId:
+    """Test cases for YouTube video ID extraction"""
+    
+    @pytest.mark.parametrize("url", [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?si=abc",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube.com/v/dQw4w9WgXcQ",
+    ])
+    def test_extracts_id_from_url(self, url):
+        """Test extraction from the supported URL formats"""
+        assert extract_youtube_id(url) == "dQw4w9WgXcQ"
+    
+    def test_bare_id_is_returned_unchanged(self):
+        """Test that a bare video ID passes through"""
+        assert extract_youtube_id("dQw4w9WgXcQ") == "dQw4w9WgXcQ"